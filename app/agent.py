@@ -1,55 +1,39 @@
-from dotenv import load_dotenv
+import asyncio
+import contextvars
+import functools
 import os
-import yaml
-from typing import Dict, Any
+import queue
+import threading
+from typing import AsyncIterator, Callable, Dict, Any, Iterator, Optional
 from pydantic import BaseModel, Field
 
-from langchain.tools import Tool, StructuredTool
-from langchain.agents import create_tool_calling_agent, AgentExecutor
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_openai import ChatOpenAI
-from langchain_aws import ChatBedrock
-
+from . import metrics
+from .config import CONFIG, resolve_path
 from .prompts import SYSTEM_PROMPT
-from .memory import ConversationBuffer
-from .guardrails import validate_demographics, pii_minimize, DISCLAIMER
-from .tools.savings_model import predict_savings_amount
-from .tools.insurance_model import recommend_insurance
-from .tools.profile_store import upsert_profile, get_profile
+from .memory import SessionManager
+from .router import match_intent, render
+from .guardrails import validate_demographics, pii_minimize, redact_pii, StreamRedactor, DISCLAIMER
+from .tools import model_registry
+from .tools.retirement_model import project_retirement
+from .tools.profile_store import upsert_profile, get_profile, profile_hash, on_profile_change
+from .response_cache import ResponseCache
+from .tool_cache import ToolResultCache
+from .token_budget import compact_tool, current_usage, fit_history, record_prompt, start_turn
 from .tools.market import market_snapshot
 from .tools.market_data import get_stock_quote
+from .tools.portfolio import analyze_portfolio
 
 
-env_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".env"))
-load_dotenv(dotenv_path=env_path)
-
-# ---------------------------------------------------------------------
-# Load config
-# ---------------------------------------------------------------------
-CONFIG = {}
-CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.yaml")
-if os.path.exists(CONFIG_PATH):
-    with open(CONFIG_PATH, "r") as f:
-        CONFIG = yaml.safe_load(f)
-else:
-    CONFIG = {
-        "provider": "openai",
-        "openai": {"model": "gpt-4o-mini", "temperature": 0.2},
-        "memory": {"summary_window": 6},
-    }
-if "openai" not in CONFIG:
-    CONFIG["openai"] = {}
-
-CONFIG["openai"]["api_key"] = os.getenv("OPENAI_API_KEY")
-
-if not CONFIG["openai"]["api_key"]:
-    raise EnvironmentError(
-        "❌ OPENAI_API_KEY not found. Please set it in .env or as an environment variable."
-    )
 # ---------------------------------------------------------------------
-# Memory buffer
+# Per-user conversation memory
 # ---------------------------------------------------------------------
-buffer = ConversationBuffer(window=int(CONFIG.get("memory", {}).get("summary_window", 6)))
+_mem_cfg = CONFIG.get("memory", {})
+sessions = SessionManager(
+    window=int(_mem_cfg.get("summary_window", 6)),
+    max_sessions=int(_mem_cfg.get("max_sessions", 10000)),
+    ttl_seconds=float(_mem_cfg.get("session_ttl_seconds", 3600)),
+    summary_max_chars=int(_mem_cfg.get("summary_max_chars", 1200)),
+)
 
 
 # ---------------------------------------------------------------------
@@ -64,6 +48,24 @@ def _ensure_profile(user_id: str, demographics: Dict[str, Any]) -> Dict[str, Any
     return upsert_profile(user_id, safe_demo)
 
 
+# Model outputs are memoized on the scrubbed profile's content and the model
+# version, so repeated tool calls (within or across conversations) skip scoring.
+_tc_cfg = CONFIG.get("tool_cache", {})
+tool_cache = None
+if _tc_cfg.get("enabled", True):
+    tool_cache = ToolResultCache(max_entries=int(_tc_cfg.get("max_entries", 4096)))
+    on_profile_change(tool_cache.invalidate_user)
+
+
+def _score(model: str, user_id: str, profile: Dict[str, Any]) -> Dict[str, Any]:
+    if tool_cache is None:
+        return model_registry.predict(model, profile)
+    return tool_cache.get_or_compute(
+        model, model_registry.model_version(model), profile_hash(profile), user_id,
+        lambda: model_registry.predict(model, profile),
+    )
+
+
 # ---------------------------------------------------------------------
 # Tool logic (with graceful fallback)
 # ---------------------------------------------------------------------
@@ -82,7 +84,7 @@ def _tool_savings(user_id: str, demographics: dict | None = None) -> Dict[str, A
             }
 
     profile = _ensure_profile(user_id, demographics)
-    res = predict_savings_amount(profile)
+    res = _score("savings", user_id, profile)
     res["profile"] = profile
     return res
 
@@ -102,18 +104,56 @@ def _tool_insurance(user_id: str, demographics: dict | None = None) -> Dict[str,
             }
 
     profile = _ensure_profile(user_id, demographics)
-    res = recommend_insurance(profile)
+    res = _score("insurance", user_id, profile)
     res["profile"] = profile
     return res
 
 
+def _tool_retirement(user_id: str, retirement_age: int | None = None,
+                     annual_spending: float | None = None) -> Dict[str, Any]:
+    """Monte Carlo retirement projection from the stored profile and the savings model."""
+    profile = get_profile(user_id)
+    ok, msg = validate_demographics(profile)
+    if not ok:
+        return {
+            "error": (
+                "Missing demographics. "
+                "Please provide age, marital_status, dependents, income, net_worth, and location."
+            )
+        }
+    cfg = CONFIG.get("retirement", {})
+    savings = _score("savings", user_id, profile)
+    return project_retirement(
+        profile,
+        annual_savings=savings["annual_savings"],
+        retirement_age=int(retirement_age or cfg.get("retirement_age", 60)),
+        life_expectancy=int(cfg.get("life_expectancy", 90)),
+        annual_spending=annual_spending,
+        replacement_ratio=float(cfg.get("replacement_ratio", 0.7)),
+        expected_return=float(cfg.get("expected_return", 0.06)),
+        volatility=float(cfg.get("volatility", 0.12)),
+        n_paths=int(cfg.get("paths", 20_000)),
+        seed=cfg.get("seed"),
+    )
+
+
 def _tool_get_profile(user_id: str) -> Dict[str, Any]:
     """Return stored profile for a given user."""
     return get_profile(user_id)
 
 
+def _tool_portfolio(holdings: Dict[str, float], window: int = 21) -> Dict[str, Any]:
+    """Portfolio returns, volatility, drawdowns and diversification from cached daily bars."""
+    try:
+        return analyze_portfolio(holdings, window=window)
+    except (ValueError, RuntimeError) as e:
+        return {"error": str(e)}
+    except Exception as e:
+        return {"error": f"Could not load price history: {e}"}
+
+
 def _tool_market() -> Dict[str, Any]:
-    """Return mock market snapshot."""
+    """Return the shared market snapshot (equities, bonds, gold, crypto)."""
     return market_snapshot()
 
 
@@ -122,7 +162,6 @@ def _tool_market() -> Dict[str, Any]:
 # ---------------------------------------------------------------------
 class SavingsInput(BaseModel):
     """Inputs for the savings model tool"""
-    user_id: str = Field(..., description="User identifier")
     demographics: dict | None = Field(
         None,
         description="Demographic data of the user. "
@@ -132,7 +171,6 @@ class SavingsInput(BaseModel):
 
 class InsuranceInput(BaseModel):
     """Inputs for the insurance model tool"""
-    user_id: str = Field(..., description="User identifier")
     demographics: dict | None = Field(
         None,
         description="Demographic data of the user. "
@@ -140,52 +178,137 @@ class InsuranceInput(BaseModel):
     )
 
 
+class RetirementInput(BaseModel):
+    """Inputs for the retirement projection tool"""
+    retirement_age: int | None = Field(None, description="Planned retirement age (default 60).")
+    annual_spending: float | None = Field(
+        None,
+        description="Yearly spending in retirement, in today's money. "
+                    "Defaults to a share of current income."
+    )
+
+
+class PortfolioInput(BaseModel):
+    """Inputs for the portfolio analytics tool"""
+    holdings: Dict[str, float] = Field(
+        ...,
+        description="Map of stock symbol to weight or amount held, e.g. {\"AAPL\": 0.6, \"MSFT\": 0.4}."
+    )
+    window: int = Field(21, description="Trading days used for rolling volatility.")
+
+
 class GetProfileInput(BaseModel):
-    """Inputs for retrieving stored profile"""
-    user_id: str = Field(..., description="User identifier")
+    """Inputs for retrieving the stored profile (none: it is always the caller's)"""
+
+
+# The user of the current turn, set per turn like _live_data_used below. Profile
+# tools act on this user only, so the model can neither read nor write another
+# user's profile, and the response cache key (the caller's profile hash) covers
+# everything the tools looked at.
+_caller: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("caller", default=None)
+
+
+def _for_caller(func: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        user_id = _caller.get()
+        if user_id is None:
+            return {"error": "No user is associated with this conversation."}
+        return func(user_id, *args, **kwargs)
+    return wrapper
+
+
+# Turns that used live prices (quotes, snapshot, portfolio history) are kept out
+# of the response cache, which would otherwise replay them long after the quote
+# cache has moved on. Set per turn; tool threads share it through the copied context.
+_live_data_used: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "live_data_used", default=None)
+
+
+def _live_data(func: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        used = _live_data_used.get()
+        if used is not None:
+            used.set()
+        return func(*args, **kwargs)
+    return wrapper
 
 
 # ---------------------------------------------------------------------
 # Define LangChain Tools (structured)
 # ---------------------------------------------------------------------
-tools = [
-    StructuredTool.from_function(
-        name="savings_model",
-        description="Estimate savings amounts and rate for a user.",
-        func=_tool_savings,
-        args_schema=SavingsInput,
-    ),
-    StructuredTool.from_function(
-        name="insurance_model",
-        description="Recommend insurance coverages for a user.",
-        func=_tool_insurance,
-        args_schema=InsuranceInput,
-    ),
-    StructuredTool.from_function(
-        name="get_profile",
-        description="Load the user's stored profile by user_id.",
-        func=lambda user_id: _tool_get_profile(user_id),
-        args_schema=GetProfileInput,
-    ),
-    Tool(
-        name="market_snapshot",
-        description="Get a lightweight market snapshot.",
-        func=lambda _: _tool_market(),
-    ),
-    Tool(
-    name="stock_quote",
-    description="Fetches real-time stock data from Alpha Vantage. Input should be a stock symbol like 'AAPL' or 'GOOGL'.",
-    func=lambda symbol: get_stock_quote(symbol)
- ),
-]
+# LangChain is imported here rather than at module level so that importing
+# app.agent (FastAPI workers, Streamlit reruns) stays cheap. Results are
+# compacted (no embedded profile, boilerplate notes) before the LLM sees them.
+def _build_tools():
+    from langchain.tools import Tool, StructuredTool
+    from .executor import pooled
+
+    # Async runs (/chat, streaming) execute the sync functions on the shared tool
+    # pool, bounded by agent.max_parallel_tools like the sync executor.
+    def structured(name: str, description: str, func, args_schema):
+        return StructuredTool.from_function(name=name, description=description, func=func,
+                                            coroutine=pooled(func), args_schema=args_schema)
+
+    def single_input(name: str, description: str, func):
+        return Tool(name=name, description=description, func=func, coroutine=pooled(func))
+
+    return [
+        structured(
+            "savings_model",
+            "Estimate savings amounts and rate for the current user.",
+            compact_tool(_for_caller(_tool_savings)),
+            SavingsInput,
+        ),
+        structured(
+            "insurance_model",
+            "Recommend insurance coverages for the current user.",
+            compact_tool(_for_caller(_tool_insurance)),
+            InsuranceInput,
+        ),
+        structured(
+            "retirement_projection",
+            "Project retirement savings with a Monte Carlo simulation: "
+            "probability the money lasts and wealth percentile bands by age.",
+            compact_tool(_for_caller(_tool_retirement)),
+            RetirementInput,
+        ),
+        structured(
+            "portfolio_analytics",
+            "Analyse a portfolio of stock holdings from daily price history: returns, "
+            "volatility, drawdowns, correlations and diversification metrics.",
+            compact_tool(_live_data(_tool_portfolio)),
+            PortfolioInput,
+        ),
+        structured(
+            "get_profile",
+            "Load the current user's stored profile.",
+            compact_tool(_for_caller(_tool_get_profile)),
+            GetProfileInput,
+        ),
+        single_input(
+            "market_snapshot",
+            "Get a lightweight market snapshot.",
+            _live_data(lambda _: _tool_market()),
+        ),
+        single_input(
+            "stock_quote",
+            "Fetches real-time stock data from Alpha Vantage. Input should be a stock symbol like 'AAPL' or 'GOOGL'.",
+            _live_data(lambda symbol: get_stock_quote(symbol)),
+        ),
+    ]
 
 
 # ---------------------------------------------------------------------
 # LLM provider factory
 # ---------------------------------------------------------------------
 def _make_llm():
+    """Build the configured chat model; only the selected provider's package is imported."""
     provider = CONFIG.get("provider", "openai")
     if provider == "bedrock":
+        from langchain_aws import ChatBedrock
+
         region = CONFIG.get("bedrock", {}).get("region", os.getenv("AWS_REGION", "us-east-1"))
         model_id = CONFIG.get("bedrock", {}).get(
             "model_id", "anthropic.claude-3-sonnet-20240229-v1:0"
@@ -193,6 +316,12 @@ def _make_llm():
         temperature = CONFIG.get("bedrock", {}).get("temperature", 0.2)
         return ChatBedrock(model_id=model_id, region=region, temperature=temperature)
     else:
+        if not os.getenv("OPENAI_API_KEY"):
+            raise EnvironmentError(
+                "❌ OPENAI_API_KEY not found. Please set it in .env or as an environment variable."
+            )
+        from langchain_openai import ChatOpenAI
+
         model = CONFIG.get("openai", {}).get("model", "gpt-4o-mini")
         temperature = CONFIG.get("openai", {}).get("temperature", 0.2)
         return ChatOpenAI(model=model, temperature=temperature)
@@ -201,38 +330,324 @@ def _make_llm():
 # ---------------------------------------------------------------------
 # Build agent
 # ---------------------------------------------------------------------
-def build_agent():
-    llm = _make_llm()
+def build_agent(llm=None):
+    from langchain.agents import create_tool_calling_agent
+    from .executor import ParallelAgentExecutor
+    from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+    llm = llm or _make_llm()
+    tools = _build_tools()
 
     prompt = ChatPromptTemplate.from_messages([
-        ("system", SYSTEM_PROMPT),
+        ("system", SYSTEM_PROMPT + "{conversation_summary}"),
         MessagesPlaceholder("chat_history"),
         ("human", "{input}"),
         MessagesPlaceholder("agent_scratchpad"),  # required for tool-calling
     ])
 
     agent = create_tool_calling_agent(llm, tools, prompt)
-    executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
+    executor = ParallelAgentExecutor(
+        agent=agent, tools=tools, verbose=bool(CONFIG.get("agent", {}).get("verbose", False))
+    )
     return executor
 
 
+_RUN_CONFIG: Dict[str, Any] | None = None
+
+
+def _run_config() -> Dict[str, Any]:
+    """Per-invoke config; carries the metrics callback so it reaches every nested LLM/tool run."""
+    global _RUN_CONFIG
+    if _RUN_CONFIG is None:
+        if metrics.ENABLED:
+            from .callbacks import MetricsCallbackHandler
+
+            _RUN_CONFIG = {"callbacks": [MetricsCallbackHandler()]}
+        else:
+            _RUN_CONFIG = {}
+    return _RUN_CONFIG
+
+
 # ---------------------------------------------------------------------
-# Agent instance and chat interface
+# Agent instance (built lazily on first chat) and chat interface
 # ---------------------------------------------------------------------
-AGENT = build_agent()
+_AGENT = None
+_AGENT_LOCK = threading.Lock()
+
+
+def get_agent():
+    """Return the process-wide agent, building it on first use."""
+    global _AGENT
+    if _AGENT is None:
+        with _AGENT_LOCK:
+            if _AGENT is None:
+                _AGENT = build_agent()
+    return _AGENT
+
+
+def set_agent(agent) -> None:
+    """Install a prebuilt agent (e.g. one backed by a fake LLM in benchmarks)."""
+    global _AGENT
+    with _AGENT_LOCK:
+        _AGENT = agent
+
+
+def warmup() -> None:
+    """Build the agent ahead of the first request (server startup hook)."""
+    get_agent()
+
+
+# Messages are redacted on the way in and replies on the way out, so the LLM,
+# the response cache and the stored history (and its summary) only ever see
+# masked text.
+_REDACT = bool(CONFIG.get("guardrails", {}).get("redact_pii", True))
+
+
+def _redact(text: str) -> str:
+    return redact_pii(text) if _REDACT else text
+
+
+def _summary_block(summary: str) -> str:
+    return f"\n\nSummary of earlier conversation:\n{summary}" if summary else ""
+
+
+def _prepare(user_id: str, message: str):
+    """Snapshot the user's history for this turn and record the new message.
+
+    History is trimmed to the token budget here (older turns folded into the
+    summary) so cache keys and prompts both see the bounded version.
+    """
+    start_turn()
+    _caller.set(user_id)
+    _live_data_used.set(threading.Event())
+    session = sessions.get(user_id)
+    history, summary = fit_history(session.get(), session.summary, session.summarizer)
+    inputs = {
+        "input": message,
+        "chat_history": history,
+        "conversation_summary": _summary_block(summary),
+    }
+    session.add("human", message)
+    return session, inputs
+
+
+def _count_prompt(inputs: Dict[str, Any]) -> None:
+    history = inputs["chat_history"]
+    record_prompt(SYSTEM_PROMPT, inputs["conversation_summary"], inputs["input"],
+                  *(m["content"] for m in history), messages=len(history) + 2)
+
+
+def _finish(session, text: str) -> str:
+    if DISCLAIMER not in text:
+        text += f"\n\n{DISCLAIMER}"
+    session.add("ai", text)
+    return text
+
+
+# ---------------------------------------------------------------------
+# Fast path: structured requests answered without the LLM
+# ---------------------------------------------------------------------
+_ROUTER_ENABLED = CONFIG.get("router", {}).get("enabled", True)
+
+_FAST_TOOLS = {
+    "savings": lambda user_id, arg: _tool_savings(user_id),
+    "insurance": lambda user_id, arg: _tool_insurance(user_id),
+    "profile": lambda user_id, arg: _tool_get_profile(user_id),
+    "quote": lambda user_id, arg: get_stock_quote(arg),
+}
+
+
+def _fast_path(user_id: str, message: str) -> str | None:
+    """Templated reply for a high-confidence intent, or None to fall through to the agent."""
+    if not _ROUTER_ENABLED:
+        return None
+    intent = match_intent(message)
+    if intent is None:
+        return None
+    name, arg = intent
+    try:
+        res = _FAST_TOOLS[name](user_id, arg)
+    except Exception:
+        return None
+    # Missing profile, quote errors etc. are left to the agent to explain.
+    if not res or "error" in res:
+        return None
+    return render(name, res)
+
+
+# ---------------------------------------------------------------------
+# Response cache: identical question + history + profile content -> same reply
+# ---------------------------------------------------------------------
+_rc_cfg = CONFIG.get("response_cache", {})
+response_cache = None
+if _rc_cfg.get("enabled", True):
+    response_cache = ResponseCache(
+        ttl_seconds=float(_rc_cfg.get("ttl_seconds", 3600)),
+        max_entries=int(_rc_cfg.get("max_entries", 1024)),
+        disk_path=resolve_path(_rc_cfg["disk_path"]) if _rc_cfg.get("disk_path") else None,
+    )
+    on_profile_change(response_cache.invalidate_user)
+
+
+def _cached_reply(user_id: str, inputs: Dict[str, Any]):
+    """Return (key, profile_hash, cached_text); key is None when caching is disabled."""
+    if response_cache is None:
+        return None, None, None
+    ph = profile_hash(get_profile(user_id))
+    key = ResponseCache.key(
+        inputs["input"], inputs["chat_history"], inputs["conversation_summary"], ph
+    )
+    return key, ph, response_cache.get(key)
+
+
+def _remember_reply(user_id: str, key: str | None, ph: str | None, text: str) -> None:
+    # Only cache runs that left the profile untouched, otherwise a hit would skip a tool's write,
+    # and that didn't use live market data.
+    used = _live_data_used.get()
+    if used is not None and used.is_set():
+        return
+    if key and text and profile_hash(get_profile(user_id)) == ph:
+        response_cache.put(key, text, owner=user_id)
 
 
 def chat(user_id: str, message: str) -> str:
     """Chat entrypoint for Streamlit/FastAPI."""
-    buffer.add("human", message)
+    message = _redact(message)
+    fast = _fast_path(user_id, message)
+    session, inputs = _prepare(user_id, message)
+    if fast is not None:
+        metrics.CHAT_ROUTES.inc("fast")
+        return _finish(session, fast)
+    key, ph, cached = _cached_reply(user_id, inputs)
+    if cached is not None:
+        metrics.CHAT_ROUTES.inc("cache")
+        return _finish(session, cached)
+    try:
+        _count_prompt(inputs)
+        res = get_agent().invoke(inputs, config=_run_config())
+        text = _redact(res.get("output", "").strip())
+        _remember_reply(user_id, key, ph, text)
+        metrics.CHAT_ROUTES.inc("agent")
+    except Exception as e:
+        metrics.CHAT_ROUTES.inc("error")
+        text = f"⚠️ Error: {e}"
+    return _finish(session, text)
+
+
+async def achat(user_id: str, message: str) -> str:
+    """Async variant of chat(); does not hold a worker thread while the LLM runs."""
+    message = _redact(message)
+    fast = await asyncio.to_thread(_fast_path, user_id, message)
+    session, inputs = _prepare(user_id, message)
+    if fast is not None:
+        metrics.CHAT_ROUTES.inc("fast")
+        return _finish(session, fast)
+    key, ph, cached = await asyncio.to_thread(_cached_reply, user_id, inputs)
+    if cached is not None:
+        metrics.CHAT_ROUTES.inc("cache")
+        return _finish(session, cached)
     try:
-        res = AGENT.invoke({"input": message, "chat_history": buffer.get()})
-        text = res.get("output", "").strip()
+        _count_prompt(inputs)
+        res = await get_agent().ainvoke(inputs, config=_run_config())
+        text = _redact(res.get("output", "").strip())
+        await asyncio.to_thread(_remember_reply, user_id, key, ph, text)
+        metrics.CHAT_ROUTES.inc("agent")
     except Exception as e:
+        metrics.CHAT_ROUTES.inc("error")
         text = f"⚠️ Error: {e}"
+    return _finish(session, text)
+
+
+def _chunk_text(chunk) -> str:
+    # OpenAI streams plain strings; Anthropic (Bedrock) streams lists of content blocks.
+    content = getattr(chunk, "content", "")
+    if isinstance(content, list):
+        return "".join(b.get("text", "") for b in content if isinstance(b, dict))
+    return content or ""
+
+
+async def astream_chat(user_id: str, message: str) -> AsyncIterator[Dict[str, Any]]:
+    """Stream one chat turn as events.
+
+    Yields {"event": "token", "data": str} for LLM output, "tool_start"/"tool_end"
+    for tool calls, and finally {"event": "done", "data": full_reply, "usage": {...}}. The
+    disclaimer is streamed as a last token when the model did not include it.
+    Tokens pass through a StreamRedactor, so they lag the model slightly.
+    """
+    message = _redact(message)
+    fast = await asyncio.to_thread(_fast_path, user_id, message)
+    session, inputs = _prepare(user_id, message)
+    route = "fast"
+    if fast is None:
+        route = "cache"
+        key, ph, fast = await asyncio.to_thread(_cached_reply, user_id, inputs)
+    if fast is not None:
+        metrics.CHAT_ROUTES.inc(route)
+        yield {"event": "token", "data": fast}
+        if DISCLAIMER not in fast:
+            yield {"event": "token", "data": f"\n\n{DISCLAIMER}"}
+        yield {"event": "done", "data": _finish(session, fast), "usage": current_usage()}
+        return
+    text = ""
+    streamed = False
+    redactor = StreamRedactor() if _REDACT else None
+    try:
+        _count_prompt(inputs)
+        async for ev in get_agent().astream_events(inputs, config=_run_config(), version="v2"):
+            kind = ev["event"]
+            if kind == "on_chat_model_stream":
+                token = _chunk_text(ev["data"].get("chunk"))
+                streamed = streamed or bool(token)
+                if token and redactor:
+                    token = redactor.feed(token)
+                if token:
+                    yield {"event": "token", "data": token}
+            elif kind == "on_tool_start":
+                if redactor and (tail := redactor.flush()):
+                    yield {"event": "token", "data": tail}
+                yield {"event": "tool_start", "name": ev["name"], "input": ev["data"].get("input")}
+            elif kind == "on_tool_end":
+                yield {"event": "tool_end", "name": ev["name"]}
+            elif kind == "on_chain_end" and not ev.get("parent_ids"):
+                text = _redact((ev["data"].get("output") or {}).get("output", "").strip())
+        if not streamed and text:
+            # The model doesn't stream: send the whole reply as one token.
+            yield {"event": "token", "data": text}
+        await asyncio.to_thread(_remember_reply, user_id, key, ph, text)
+        metrics.CHAT_ROUTES.inc("agent")
+    except Exception as e:
+        metrics.CHAT_ROUTES.inc("error")
+        text = f"⚠️ Error: {e}"
+        yield {"event": "error", "data": text}
 
+    if redactor and (tail := redactor.flush()):
+        yield {"event": "token", "data": tail}
     if DISCLAIMER not in text:
-        text += f"\n\n{DISCLAIMER}"
-
-    buffer.add("ai", text)
-    return text
+        yield {"event": "token", "data": f"\n\n{DISCLAIMER}"}
+    yield {"event": "done", "data": _finish(session, text), "usage": current_usage()}
+
+
+def chat_stream(user_id: str, message: str) -> Iterator[str]:
+    """Sync generator of reply text as it streams (e.g. for Streamlit's st.write_stream).
+
+    Runs astream_chat on its own event loop in a helper thread; the full reply
+    is recorded in the user's history exactly as with chat().
+    """
+    out: "queue.Queue" = queue.Queue()
+    end = object()
+
+    async def pump():
+        try:
+            async for ev in astream_chat(user_id, message):
+                if ev["event"] in ("token", "error"):
+                    out.put(ev["data"])
+        except BaseException as e:  # surfaced in the consuming thread
+            out.put(e)
+        finally:
+            out.put(end)
+
+    threading.Thread(target=asyncio.run, args=(pump(),), name="chat-stream", daemon=True).start()
+    while (item := out.get()) is not end:
+        if isinstance(item, BaseException):
+            raise item
+        yield item
@@ -0,0 +1,113 @@
+import json
+from typing import Dict, Any, Iterable, Iterator, List
+
+import numpy as np
+
+from .tools.model_registry import FEATURE_TYPES, FEATURES, get_model
+
+# Columns the batch scorers read; anything else in a record is ignored.
+BATCH_FIELDS = FEATURES
+
+
+# ---------------------------------------------------------------------
+# Payload parsing
+# ---------------------------------------------------------------------
+def columns_from_records(records: Iterable[Dict[str, Any]]) -> Dict[str, list]:
+    """Pivot profile dicts into columns (missing fields default to 0 like the scalar models)."""
+    cols: Dict[str, list] = {k: [] for k in ["user_id"] + BATCH_FIELDS}
+    for i, rec in enumerate(records):
+        if not isinstance(rec, dict):
+            raise ValueError(f"Record {i} is not a JSON object.")
+        cols["user_id"].append(rec.get("user_id"))
+        for k in BATCH_FIELDS:
+            cols[k].append(rec.get(k, 0))
+    return cols
+
+
+def parse_ndjson(body: bytes) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in body.splitlines() if line.strip()]
+
+
+def parse_columns(body: bytes, ndjson: bool) -> Dict[str, list]:
+    """Accept either NDJSON profile records or a columnar JSON object."""
+    if ndjson:
+        return columns_from_records(parse_ndjson(body))
+    data = json.loads(body)
+    if isinstance(data, list):
+        return columns_from_records(data)
+    missing = [k for k in BATCH_FIELDS if k not in data]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    n = len(data["age"])
+    if any(len(data[k]) != n for k in BATCH_FIELDS):
+        raise ValueError("All columns must have the same length.")
+    cols = {k: data[k] for k in BATCH_FIELDS}
+    cols["user_id"] = data.get("user_id") or [None] * n
+    if not isinstance(cols["user_id"], list) or len(cols["user_id"]) != n:
+        raise ValueError("user_id must have the same length as the feature columns.")
+    return cols
+
+
+# ---------------------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------------------
+def coerce_columns(cols: Dict[str, list]) -> Dict[int, str]:
+    """Convert non-numeric feature columns in place, like the scalar models would.
+
+    Cells that can't be converted become 0 and their row is returned as an error,
+    so one bad value doesn't fail the whole request.
+    """
+    errors: Dict[int, str] = {}
+    for k in BATCH_FIELDS:
+        col = cols[k]
+        arr = np.asarray(col)
+        if arr.ndim == 1 and arr.dtype.kind in "biuf":
+            cols[k] = arr  # already numeric; saves the scorer converting it again
+            continue
+        convert = FEATURE_TYPES[k]
+        converted = []
+        for i, value in enumerate(col):
+            try:
+                converted.append(convert(value))
+            except (TypeError, ValueError):
+                converted.append(0)
+                errors.setdefault(i, f"{k} must be a number, got {value!r}")
+        cols[k] = converted
+    return errors
+
+
+def invalid_rows(cols: Dict[str, list]) -> Dict[int, str]:
+    """Vectorized subset of validate_demographics for the numeric columns."""
+    age = np.asarray(cols["age"], dtype=np.float64).astype(np.int64)
+    income = np.asarray(cols["income"], dtype=np.float64)
+    net_worth = np.asarray(cols["net_worth"], dtype=np.float64)
+
+    errors: Dict[int, str] = {}
+    for i in np.flatnonzero((income < 0) | (net_worth < 0)).tolist():
+        errors[i] = "Income and net worth must be non-negative."
+    for i in np.flatnonzero((age <= 0) | (age >= 120)).tolist():
+        errors[i] = "Age must be between 1 and 119."
+    return errors
+
+
+def score_columns(kind: str, cols: Dict[str, list]) -> Dict[str, Any]:
+    """Score every row in one pass; invalid rows are reported in `errors` by index."""
+    bad_values = coerce_columns(cols)
+    results = get_model(kind).predict_batch(*(cols[k] for k in BATCH_FIELDS))
+    return {
+        "count": len(cols["age"]),
+        "user_id": cols["user_id"],
+        "results": results,
+        "errors": {**invalid_rows(cols), **bad_values},
+    }
+
+
+def iter_ndjson(kind: str, scored: Dict[str, Any]) -> Iterator[bytes]:
+    """Stream scored rows as NDJSON, each shaped like the single-user endpoint result."""
+    errors = scored["errors"]
+    rows = get_model(kind).rows(scored["results"])
+    for i, (uid, row) in enumerate(zip(scored["user_id"], rows)):
+        if i in errors:
+            row = {"error": errors[i]}
+        row["user_id"] = uid
+        yield (json.dumps(row) + "\n").encode("utf-8")
@@ -0,0 +1,290 @@
+"""Stream CSV/JSONL profiles through validate -> scrub -> bulk upsert -> score.
+
+    python -m app.bulk import customers.csv --out scored.jsonl --workers 8
+    python -m app.bulk export --format csv --out profiles.csv
+
+Input is read and processed in fixed-size chunks with a bounded number in
+flight, so memory stays flat however large the file is. Rejected rows go to a
+side file (default: <input>.rejects.jsonl) with their line number and reason.
+CSV input must have a header row and one record per line.
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .guardrails import validate_demographics, pii_minimize
+from .tools import profile_store
+from .tools.model_registry import feature_row, get_model
+
+CHUNK_SIZE = 5000
+EXPORT_FIELDS = ["user_id", "age", "marital_status", "dependents", "income", "net_worth",
+                 "location", "_updated_at"]
+_INT_FIELDS = {"age", "dependents"}
+_FLOAT_FIELDS = {"income", "net_worth"}
+
+
+# ---------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------
+def _coerce_csv(row: Dict[str, str]) -> Dict[str, Any]:
+    rec: Dict[str, Any] = {}
+    for k, v in row.items():
+        if v == "":
+            continue
+        if k in _INT_FIELDS:
+            rec[k] = int(float(v))
+        elif k in _FLOAT_FIELDS:
+            rec[k] = float(v)
+        else:
+            rec[k] = v
+    return rec
+
+
+def parse_lines(fmt: str, header: Optional[str], lines: List[str],
+                start: int) -> Iterator[Tuple[int, Any]]:
+    """Yield (line number, record dict or the exception raised while parsing it)."""
+    if fmt == "csv":
+        fieldnames = next(csv.reader([header]))
+        reader = csv.reader(lines)
+        for values in reader:
+            if not values:
+                continue
+            line_no = start + reader.line_num - 1  # blank lines are skipped but still counted
+            try:
+                yield line_no, _coerce_csv(dict(zip(fieldnames, values)))
+            except ValueError as e:
+                yield line_no, e
+    else:
+        for line_no, line in enumerate(lines, start):
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+                if not isinstance(rec, dict):
+                    raise ValueError("Expected a JSON object per line.")
+                yield line_no, rec
+            except ValueError as e:
+                yield line_no, e
+
+
+def iter_chunks(lines: Iterable[str], chunk_size: int = CHUNK_SIZE,
+                first_line: int = 1) -> Iterator[Tuple[int, List[str]]]:
+    """Group lines into (first line number, lines) chunks without reading ahead."""
+    chunk: List[str] = []
+    start = first_line
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield start, chunk
+            start += len(chunk)
+            chunk = []
+    if chunk:
+        yield start, chunk
+
+
+# ---------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------
+def _score_rows(features: List[List[Any]]) -> List[Any]:
+    """(savings, insurance) per feature row, or the exception for rows the models reject."""
+    models = (get_model("savings"), get_model("insurance"))
+    try:
+        cols = [list(col) for col in zip(*features)]
+        return list(zip(*(list(m.rows(m.predict_batch(*cols))) for m in models)))
+    except Exception:
+        pass
+    # Something in the chunk broke the batch call: score row by row to isolate it.
+    results: List[Any] = []
+    for row in features:
+        try:
+            results.append(tuple(next(iter(m.rows(m.predict_batch(*([v] for v in row)))))
+                                 for m in models))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def process_chunk(fmt: str, header: Optional[str], lines: List[str], start: int,
+                  upsert: bool = True) -> Tuple[List[str], List[str]]:
+    """Validate, scrub, score and upsert one chunk; returns (result lines, reject lines) as JSON.
+
+    Rows are scored before anything is written, so a row the models reject is
+    reported with the other rejects and never stored.
+    """
+    accepted: List[Tuple[int, str, Dict[str, Any], List[Any]]] = []
+    rejects: List[str] = []
+
+    def reject(line_no: int, user_id: Optional[str], error: str, record: Dict[str, Any]) -> None:
+        rejects.append(json.dumps({"line": line_no, "user_id": user_id or None,
+                                   "error": error, "record": record}, default=str))
+
+    for line_no, rec in parse_lines(fmt, header, lines, start):
+        if isinstance(rec, Exception):
+            rejects.append(json.dumps({"line": line_no, "error": f"Unparseable row: {rec}"}))
+            continue
+        safe = pii_minimize(rec)
+        user_id = str(safe.pop("user_id", "") or "").strip()
+        try:
+            ok, msg = validate_demographics(safe) if user_id else (False, "Missing user_id")
+            features = feature_row(safe) if ok else None
+        except (TypeError, ValueError) as e:
+            ok, msg = False, f"Invalid value: {e}"
+        if not ok:
+            reject(line_no, user_id, msg, safe)
+            continue
+        accepted.append((line_no, user_id, safe, features))
+
+    results: List[str] = []
+    stored: List[Tuple[str, Dict[str, Any]]] = []
+    scores = _score_rows([features for *_, features in accepted]) if accepted else []
+    for (line_no, user_id, safe, _), score in zip(accepted, scores):
+        if isinstance(score, Exception):
+            reject(line_no, user_id, f"Scoring failed: {score}", safe)
+            continue
+        stored.append((user_id, safe))
+        results.append(json.dumps({"user_id": user_id, "savings": score[0], "insurance": score[1]}))
+    if upsert and stored:
+        profile_store.upsert_profiles(stored)
+    return results, rejects
+
+
+def _init_worker() -> None:
+    # Each process opens its own store connection instead of inheriting the parent's.
+    from .config import CONFIG
+    from .memory import make_profile_store
+
+    profile_store.use_store(make_profile_store(CONFIG.get("profile_store", {})))
+
+
+def run_import(lines: Iterable[str], fmt: str, workers: int = 1, chunk_size: int = CHUNK_SIZE,
+               upsert: bool = True) -> Iterator[Tuple[List[str], List[str]]]:
+    """Yield (results, rejects) per chunk, in input order.
+
+    With workers > 1 chunks are scored in a process pool, keeping at most
+    2 x workers chunks in flight.
+    """
+    lines = iter(lines)
+    header = next(lines, "").rstrip("\r\n") if fmt == "csv" else None
+    chunks = iter_chunks((line.rstrip("\r\n") for line in lines), chunk_size,
+                         first_line=2 if fmt == "csv" else 1)
+    if workers <= 1:
+        for start, chunk in chunks:
+            yield process_chunk(fmt, header, chunk, start, upsert)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending: deque = deque()
+        for start, chunk in chunks:
+            pending.append(pool.submit(process_chunk, fmt, header, chunk, start, upsert))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def iter_export(fmt: str = "jsonl") -> Iterator[str]:
+    """Stream every stored profile as JSONL or CSV text."""
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for user_id, profile in profile_store.iter_profiles():
+            writer.writerow({**profile, "user_id": user_id})
+            if buf.tell() > 65536:
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+        yield buf.getvalue()
+    else:
+        for user_id, profile in profile_store.iter_profiles():
+            yield json.dumps({"user_id": user_id, **profile}) + "\n"
+
+
+# ---------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------
+def _format_of(path: str, given: Optional[str]) -> str:
+    if given:
+        return given
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def _cmd_import(args) -> int:
+    fmt = _format_of(args.src, args.format)
+    rejects_path = args.rejects or (
+        (args.src if args.src != "-" else "stdin") + ".rejects.jsonl")
+    src = sys.stdin if args.src == "-" else open(args.src, "r", encoding="utf-8", newline="")
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    accepted = rejected = 0
+    started = time.perf_counter()
+    try:
+        with open(rejects_path, "w", encoding="utf-8") as rej:
+            for results, rejects in run_import(src, fmt, args.workers, args.chunk_size,
+                                               upsert=not args.score_only):
+                accepted += len(results)
+                rejected += len(rejects)
+                if results:
+                    out.write("\n".join(results) + "\n")
+                if rejects:
+                    rej.write("\n".join(rejects) + "\n")
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - started
+    print(f"Imported {accepted} profiles, rejected {rejected} (see {rejects_path}) "
+          f"in {elapsed:.1f}s ({(accepted + rejected) / max(elapsed, 1e-9):,.0f} rows/s)",
+          file=sys.stderr)
+    return 0
+
+
+def _cmd_export(args) -> int:
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8", newline="")
+    try:
+        for text in iter_export(args.format):
+            out.write(text)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="validate, store and score a CSV/JSONL file")
+    imp.add_argument("src", help="input file ('-' for stdin)")
+    imp.add_argument("--format", choices=["csv", "jsonl"], help="default: from the file extension")
+    imp.add_argument("--out", default="-", help="scored rows as JSONL (default: stdout)")
+    imp.add_argument("--rejects", help="rejected rows (default: <src>.rejects.jsonl)")
+    imp.add_argument("--workers", type=int, default=1,
+                     help="scoring processes; more than one needs the sqlite profile store")
+    imp.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    imp.add_argument("--score-only", action="store_true", help="score without writing profiles")
+    imp.set_defaults(func=_cmd_import)
+
+    exp = sub.add_parser("export", help="write every stored profile")
+    exp.add_argument("--format", choices=["csv", "jsonl"], default="jsonl")
+    exp.add_argument("--out", default="-")
+    exp.set_defaults(func=_cmd_export)
+
+    args = parser.parse_args(argv)
+    if args.command == "import" and args.workers > 1 and not args.score_only:
+        from .config import CONFIG
+
+        # JSON profile files are read-modify-written whole; concurrent processes lose updates.
+        if CONFIG.get("profile_store", {}).get("backend", "json") != "sqlite":
+            parser.error("--workers > 1 needs profile_store.backend: sqlite (or --score-only)")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import threading
+import time
+from typing import Any, Dict
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from . import metrics
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Feeds agent steps, LLM calls (with token usage) and tool calls into app.metrics.
+
+    One instance is shared by all runs; in-flight state is keyed by run_id.
+    """
+
+    def __init__(self):
+        self._started: Dict[UUID, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID, *info: Any) -> None:
+        with self._lock:
+            self._started[run_id] = (time.perf_counter(), *info)
+
+    def _stop(self, run_id: UUID):
+        with self._lock:
+            entry = self._started.pop(run_id, None)
+        if entry is None:
+            return None, ()
+        return time.perf_counter() - entry[0], entry[1:]
+
+    # Agent steps: time from the executor starting (or the previous step) to each decision.
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        if parent_run_id is None:
+            self._start(run_id)
+
+    def _step(self, run_id: UUID) -> None:
+        elapsed, _ = self._stop(run_id)
+        if elapsed is not None:
+            metrics.AGENT_STEP_SECONDS.observe(elapsed)
+            self._start(run_id)
+
+    def on_agent_action(self, action, *, run_id, **kwargs):
+        self._step(run_id)
+
+    def on_agent_finish(self, finish, *, run_id, **kwargs):
+        self._step(run_id)
+
+    def on_chain_end(self, outputs, *, run_id, parent_run_id=None, **kwargs):
+        if parent_run_id is None:
+            self._stop(run_id)
+
+    def on_chain_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        if parent_run_id is None:
+            self._stop(run_id)
+
+    # LLM calls
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model") or params.get("model_name") or params.get("model_id") or "unknown"
+        self._start(run_id, str(model))
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self.on_chat_model_start(serialized, prompts, run_id=run_id, **kwargs)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        elapsed, info = self._stop(run_id)
+        if elapsed is None:
+            return
+        model = info[0]
+        metrics.LLM_SECONDS.observe(elapsed, model, "ok")
+        prompt_tokens, completion_tokens = _token_usage(response)
+        if prompt_tokens:
+            metrics.LLM_TOKENS.inc(model, "prompt", amount=prompt_tokens)
+        if completion_tokens:
+            metrics.LLM_TOKENS.inc(model, "completion", amount=completion_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        elapsed, info = self._stop(run_id)
+        if elapsed is not None:
+            metrics.LLM_SECONDS.observe(elapsed, info[0], "error")
+
+    # Tool calls
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._start(run_id, (serialized or {}).get("name") or kwargs.get("name") or "unknown")
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        elapsed, info = self._stop(run_id)
+        if elapsed is not None:
+            status = "error" if isinstance(output, dict) and "error" in output else "ok"
+            metrics.TOOL_SECONDS.observe(elapsed, info[0], status)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        elapsed, info = self._stop(run_id)
+        if elapsed is not None:
+            metrics.TOOL_SECONDS.observe(elapsed, info[0], "exception")
+
+
+def _token_usage(response) -> tuple:
+    """(prompt, completion) tokens from usage_metadata, falling back to OpenAI's llm_output."""
+    prompt = completion = 0
+    for gens in response.generations:
+        for gen in gens:
+            usage = getattr(getattr(gen, "message", None), "usage_metadata", None)
+            if usage:
+                prompt += usage.get("input_tokens", 0)
+                completion += usage.get("output_tokens", 0)
+    if not prompt and not completion:
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt = usage.get("prompt_tokens", 0)
+        completion = usage.get("completion_tokens", 0)
+    return prompt, completion
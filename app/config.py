@@ -0,0 +1,33 @@
+import os
+from typing import Dict, Any
+
+import yaml
+from dotenv import load_dotenv
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# ADVISOR_CONFIG points a process at another file (e.g. the load-test harness).
+CONFIG_PATH = os.getenv("ADVISOR_CONFIG") or os.path.join(ROOT_DIR, "config.yaml")
+
+load_dotenv(dotenv_path=os.path.join(ROOT_DIR, ".env"))
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "provider": "openai",
+    "openai": {"model": "gpt-4o-mini", "temperature": 0.2},
+    "memory": {"summary_window": 6},
+}
+
+
+def load_config(path: str = CONFIG_PATH) -> Dict[str, Any]:
+    """Read config.yaml, falling back to DEFAULT_CONFIG when it does not exist."""
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return yaml.safe_load(f) or {}
+    return {k: dict(v) if isinstance(v, dict) else v for k, v in DEFAULT_CONFIG.items()}
+
+
+def resolve_path(path: str) -> str:
+    """Resolve a config path relative to the project root."""
+    return path if os.path.isabs(path) else os.path.join(ROOT_DIR, path)
+
+
+CONFIG = load_config()
@@ -0,0 +1,85 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from langchain.agents import AgentExecutor
+from langchain_core.agents import AgentAction, AgentStep
+
+from .config import CONFIG
+
+# Shared by every agent run in the process (sync steps below, async runs through
+# pooled()), so concurrent chats cannot fan out into an unbounded number of threads.
+MAX_PARALLEL_TOOLS = int(CONFIG.get("agent", {}).get("max_parallel_tools", 4))
+_pool = ThreadPoolExecutor(max_workers=MAX_PARALLEL_TOOLS, thread_name_prefix="agent-tool")
+
+
+class ParallelAgentExecutor(AgentExecutor):
+    """AgentExecutor that runs the tool calls of one step concurrently.
+
+    AgentExecutor yields every AgentAction of a step before performing them one
+    by one. The actions are collected as they go by, and the first
+    _perform_agent_action of the step submits all of them to a bounded pool;
+    each call then returns its own result, so steps come back in the model's
+    order. Async runs (ainvoke/astream_events) gather the tool calls themselves;
+    tools built with pooled() coroutines run them on the same pool.
+    """
+
+    def _iter_next_step(self, name_to_tool_map, color_mapping, inputs, intermediate_steps,
+                        run_manager=None):
+        state = _state
+        outer = (state.actions, state.futures)
+        state.actions, state.futures = [], {}
+        try:
+            for item in super()._iter_next_step(
+                name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager
+            ):
+                if isinstance(item, AgentAction):
+                    state.actions.append(item)
+                yield item
+        finally:
+            state.actions, state.futures = outer
+
+    def _perform_agent_action(self, name_to_tool_map, color_mapping, agent_action,
+                              run_manager=None) -> AgentStep:
+        state = _state
+        actions: Optional[List[AgentAction]] = state.actions
+        if not actions or len(actions) < 2 or not any(a is agent_action for a in actions):
+            return super()._perform_agent_action(
+                name_to_tool_map, color_mapping, agent_action, run_manager
+            )
+        if not state.futures:
+            perform = super()._perform_agent_action
+            for action in actions:
+                # Each task gets its own copy of the context (trace id, tracing callbacks).
+                ctx = contextvars.copy_context()
+                state.futures[id(action)] = _pool.submit(
+                    ctx.run, perform, name_to_tool_map, color_mapping, action, run_manager
+                )
+        future: Future = state.futures.pop(id(agent_action))
+        return future.result()
+
+
+def pooled(func: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    """Async twin of a sync tool function that runs it on the shared tool pool.
+
+    Pass it as the tool's coroutine; otherwise LangChain runs sync tools on the
+    event loop's default executor, outside the max_parallel_tools bound.
+    """
+    @functools.wraps(func)
+    async def run(*args, **kwargs):
+        ctx = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            _pool, functools.partial(ctx.run, func, *args, **kwargs))
+    return run
+
+
+class _StepState(threading.local):
+    # Per thread: the actions of the step being executed and their futures by id().
+    actions: Optional[List[AgentAction]] = None
+    futures: Optional[Dict[int, Future]] = None
+
+
+_state = _StepState()
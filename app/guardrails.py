@@ -1,3 +1,4 @@
+import re
 from typing import Dict, Any, Tuple
 
 REQUIRED_DEMOGRAPHICS = ["age", "marital_status", "dependents", "income", "net_worth"]
@@ -20,4 +21,85 @@ def pii_minimize(demo: Dict[str, Any]) -> Dict[str, Any]:
     demo.pop("ssn", None)
     return demo
 
+# Free-text PII: one precompiled alternation, so redaction is a single scan per
+# message. Group order decides ties at the same position (e.g. an SSN-shaped
+# number is never reported as a phone number). Indian mobiles need a +91/0 prefix
+# or the 5+5 separator, so bare 10-digit amounts ("9000000000 saved") pass through.
+_PII_RE = re.compile(r"""
+    (?P<email>(?<![\w.+-])[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[A-Za-z]{2,})
+  | (?P<ssn>(?<!\d)\d{3}-\d{2}-\d{4}(?!\d))
+  | (?P<pan>\b[A-Z]{3}[ABCFGHLJPT][A-Z]\d{4}[A-Z]\b)
+  | (?P<account>(?i:\b(?:account|acct|a/c)(?:\s*(?:no|number|num|\#))?\.?)\s*[:\#-]?\s*)(?P<account_no>\d[\d -]{4,22}\d)
+  | (?P<card>(?<!\d)\d(?:[ -]?\d){12,18}(?!\d))
+  | (?P<phone>(?<![\w+])(?:(?:\+\d{1,3}[ -]?)?(?:\(\d{3}\)[ -]?\d{3}[ -]?\d{4}|\d{3}[ -]\d{3}[ -]\d{4})
+                        |(?:\+91[ -]?|0)[6-9]\d{4}[ -]?\d{5}|[6-9]\d{4}[ -]\d{5})(?!\d))
+""", re.VERBOSE)
+
+_LABELS = {"email": "[EMAIL]", "ssn": "[SSN]", "pan": "[PAN]", "card": "[CARD]", "phone": "[PHONE]"}
+
+
+def _luhn_ok(digits: str) -> bool:
+    total = 0
+    for i, ch in enumerate(reversed(digits)):
+        d = ord(ch) - 48
+        if i % 2:
+            d = d * 2 - 9 if d > 4 else d * 2
+        total += d
+    return total % 10 == 0
+
+
+def _replacement(m: "re.Match[str]") -> str:
+    kind = m.lastgroup
+    if kind == "account_no":
+        return m.group("account") + "[ACCOUNT]"
+    if kind == "card" and not _luhn_ok(re.sub(r"[ -]", "", m.group(0))):
+        return m.group(0)  # long number that is not a card (amounts, reference ids)
+    return _LABELS[kind]
+
+
+def redact_pii(text: str) -> str:
+    """Mask emails, SSNs, PANs, card/phone/account numbers in free text."""
+    if not text:
+        return text
+    return _PII_RE.sub(_replacement, text)
+
+
+class StreamRedactor:
+    """Incremental redact_pii for streamed chunks.
+
+    The last `holdback` characters are kept back so a number or address split
+    across chunks is still seen whole; call flush() at the end of the stream.
+    """
+
+    def __init__(self, holdback: int = 128):
+        self.holdback = holdback
+        self._buf = ""
+
+    def feed(self, chunk: str) -> str:
+        buf = self._buf + chunk
+        cut = len(buf) - self.holdback
+        if cut <= 0:
+            self._buf = buf
+            return ""
+        out, pos = [], 0
+        for m in _PII_RE.finditer(buf):
+            if m.end() > cut:
+                cut = min(cut, m.start())
+                break
+            out.append(buf[pos:m.start()])
+            out.append(_replacement(m))
+            pos = m.end()
+        # Avoid cutting inside a word: the next scan must see it from its start.
+        floor = max(pos, cut - self.holdback)
+        while cut > floor and not buf[cut - 1].isspace() and not buf[cut].isspace():
+            cut -= 1
+        out.append(buf[pos:cut])
+        self._buf = buf[cut:]
+        return "".join(out)
+
+    def flush(self) -> str:
+        buf, self._buf = self._buf, ""
+        return redact_pii(buf)
+
+
 DISCLAIMER = "Disclaimer: This is general information, not financial advice."
@@ -1,7 +1,10 @@
-import json, os
-from typing import Dict, Any
+import itertools, json, math, os, sqlite3, threading, time
+from collections import OrderedDict, deque
+from typing import Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
 from datetime import datetime
 
+from .config import resolve_path
+
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "profiles")
 os.makedirs(DATA_DIR, exist_ok=True)
 
@@ -23,19 +26,281 @@ class JSONProfileStore:
     def save(self, user_id: str, profile: Dict[str, Any]) -> None:
         profile = dict(profile)
         profile["_updated_at"] = datetime.utcnow().isoformat()
-        with open(self._path(user_id), "w", encoding="utf-8") as f:
+        # Write-then-rename so a concurrent load never sees a half-written file.
+        path = self._path(user_id)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
             json.dump(profile, f, indent=2)
+        os.replace(tmp, path)
+
+    def upsert(self, user_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        # Read-modify-write of the whole file; not safe across processes (use the sqlite backend).
+        current = self.load(user_id)
+        current.update(fields or {})
+        self.save(user_id, current)
+        return current
+
+    def upsert_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        count = 0
+        for user_id, fields in items:
+            self.upsert(user_id, fields)
+            count += 1
+        return count
+
+    def iter_profiles(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for name in sorted(os.listdir(self.base_dir)):
+            if name.endswith(".json"):
+                user_id = name[:-len(".json")]
+                yield user_id, self.load(user_id)
+
+
+_UPSERT_FIELD = (
+    "INSERT INTO profile_fields (user_id, field, value) VALUES (?, ?, ?) "
+    "ON CONFLICT (user_id, field) DO UPDATE SET value = excluded.value"
+)
+_UPSERT_PROFILE = (
+    "INSERT INTO profiles (user_id, updated_at) VALUES (?, ?) "
+    "ON CONFLICT (user_id) DO UPDATE SET updated_at = excluded.updated_at"
+)
+
+
+_encode_str = json.encoder.encode_basestring_ascii
+
+
+def _json_value(v: Any) -> str:
+    # Same text as json.dumps, without its per-call overhead for the common scalar types.
+    t = type(v)
+    if t is str:
+        return _encode_str(v)
+    if t is int or (t is float and math.isfinite(v)):
+        return repr(v)
+    return json.dumps(v)
+
+
+def _field_rows(user_id: str, fields: Dict[str, Any]) -> list:
+    return [(user_id, k, _json_value(v)) for k, v in fields.items() if k != "_updated_at"]
+
+
+class SQLiteProfileStore:
+    """All profiles in one WAL-mode SQLite file, one row per (user_id, field).
+
+    Lookups go through the primary-key index, and upserts touch only the given
+    fields inside a single write transaction, so concurrent workers never lose
+    each other's updates.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS profiles (
+                user_id    TEXT PRIMARY KEY,
+                updated_at TEXT NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS profile_fields (
+                user_id TEXT NOT NULL,
+                field   TEXT NOT NULL,
+                value   TEXT NOT NULL,
+                PRIMARY KEY (user_id, field)
+            ) WITHOUT ROWID;
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads; keep one per thread.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _read(self, conn: sqlite3.Connection, user_id: str) -> Dict[str, Any]:
+        row = conn.execute(
+            "SELECT updated_at FROM profiles WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if row is None:
+            return {}
+        profile = {
+            field: json.loads(value)
+            for field, value in conn.execute(
+                "SELECT field, value FROM profile_fields WHERE user_id = ?", (user_id,)
+            )
+        }
+        profile["_updated_at"] = row[0]
+        return profile
+
+    def _write(self, conn: sqlite3.Connection, user_id: str, fields: Dict[str, Any],
+               updated_at: str) -> None:
+        conn.executemany(_UPSERT_FIELD, _field_rows(user_id, fields))
+        conn.execute(_UPSERT_PROFILE, (user_id, updated_at))
+
+    def load(self, user_id: str) -> Dict[str, Any]:
+        return self._read(self._conn(), user_id)
+
+    def save(self, user_id: str, profile: Dict[str, Any]) -> None:
+        conn = self._conn()
+        with _transaction(conn):
+            conn.execute("DELETE FROM profile_fields WHERE user_id = ?", (user_id,))
+            self._write(conn, user_id, profile, datetime.utcnow().isoformat())
+
+    def upsert(self, user_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        conn = self._conn()
+        with _transaction(conn):
+            self._write(conn, user_id, fields or {}, datetime.utcnow().isoformat())
+            return self._read(conn, user_id)
+
+    def upsert_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """Field-level upsert of many profiles in one write transaction."""
+        now = datetime.utcnow().isoformat()
+        field_rows, profile_rows = [], []
+        for user_id, fields in items:
+            field_rows.extend(_field_rows(user_id, fields or {}))
+            profile_rows.append((user_id, now))
+        conn = self._conn()
+        with _transaction(conn):
+            conn.executemany(_UPSERT_FIELD, field_rows)
+            conn.executemany(_UPSERT_PROFILE, profile_rows)
+        return len(profile_rows)
+
+    def iter_profiles(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Every profile in user_id order from one streaming query, in constant memory.
+
+        Uses its own connection: the cursor stays open between items, and a
+        streaming response may resume the generator on a different thread.
+        """
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        try:
+            rows = conn.execute(
+                "SELECT p.user_id, p.updated_at, f.field, f.value FROM profiles p "
+                "LEFT JOIN profile_fields f ON f.user_id = p.user_id ORDER BY p.user_id"
+            )
+            for user_id, group in itertools.groupby(rows, key=lambda r: r[0]):
+                profile: Dict[str, Any] = {}
+                for _, updated_at, field, value in group:
+                    if field is not None:
+                        profile[field] = json.loads(value)
+                profile["_updated_at"] = updated_at
+                yield user_id, profile
+        finally:
+            conn.close()
+
+    def import_json_dir(self, src_dir: str, batch_size: int = 1000) -> int:
+        """Bulk-load a JSONProfileStore directory, keeping each file's _updated_at."""
+        conn = self._conn()
+        src = JSONProfileStore(src_dir)
+        count = 0
+        pending = []
+
+        def flush():
+            with _transaction(conn):
+                for user_id, profile in pending:
+                    self._write(conn, user_id, profile,
+                                profile.get("_updated_at") or datetime.utcnow().isoformat())
+            pending.clear()
+
+        for user_id, profile in src.iter_profiles():
+            pending.append((user_id, profile))
+            count += 1
+            if len(pending) >= batch_size:
+                flush()
+        if pending:
+            flush()
+        return count
+
+
+class _transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK on an autocommit connection."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def make_profile_store(cfg: Dict[str, Any]):
+    """Build the profile store selected by the `profile_store` section of config.yaml."""
+    backend = cfg.get("backend", "json")
+    if backend == "sqlite":
+        return SQLiteProfileStore(resolve_path(cfg.get("sqlite_path", "data/profiles.db")))
+    if backend == "json":
+        return JSONProfileStore(resolve_path(cfg.get("json_dir", DATA_DIR)))
+    raise ValueError(f"Unknown profile_store backend: {backend}")
 
 # Light-weight conversational buffer memory
 class ConversationBuffer:
-    def __init__(self, window: int = 6):
+    """Recent turns verbatim; turns that fall out of the window are folded into `summary`."""
+
+    def __init__(self, window: int = 6, summary_max_chars: int = 1200,
+                 summarizer: Optional[Callable[[str, Dict[str, str]], str]] = None):
         self.window = window
-        self.messages = []  # list of dicts {"role": "...", "content": "..."}
+        self.summary_max_chars = summary_max_chars
+        self.summarizer = summarizer or self._fold
+        self.messages = deque(maxlen=window * 2)  # dicts {"role": "...", "content": "..."}
+        self.summary = ""
+        self.last_used = time.monotonic()
 
     def add(self, role: str, content: str):
+        if len(self.messages) == self.messages.maxlen:
+            self.summary = self.summarizer(self.summary, self.messages[0])
         self.messages.append({"role": role, "content": content})
-        # Keep last N messages
-        self.messages = self.messages[-(self.window*2):]
 
     def get(self):
         return list(self.messages)
+
+    def _fold(self, summary: str, message: Dict[str, str]) -> str:
+        # Extractive fallback: one clipped line per old message, oldest lines dropped first.
+        content = " ".join(message["content"].split())
+        if len(content) > 160:
+            content = content[:157] + "..."
+        summary = f"{summary}\n- {message['role']}: {content}".strip()
+        while len(summary) > self.summary_max_chars and "\n" in summary:
+            summary = summary.split("\n", 1)[1]
+        return summary[-self.summary_max_chars:]
+
+
+class SessionManager:
+    """Per-user ConversationBuffers with LRU eviction and an idle TTL."""
+
+    def __init__(self, window: int = 6, max_sessions: int = 10000, ttl_seconds: float = 3600,
+                 summary_max_chars: int = 1200):
+        self.window = window
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.summary_max_chars = summary_max_chars
+        self._sessions: "OrderedDict[str, ConversationBuffer]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> ConversationBuffer:
+        now = time.monotonic()
+        with self._lock:
+            buf = self._sessions.pop(user_id, None)
+            self._evict(now)
+            if buf is None:
+                buf = ConversationBuffer(self.window, self.summary_max_chars)
+            buf.last_used = now
+            self._sessions[user_id] = buf
+            return buf
+
+    def drop(self, user_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(user_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _evict(self, now: float) -> None:
+        # Least recently used first, so expired sessions are always at the front.
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if len(self._sessions) < self.max_sessions and now - oldest.last_used <= self.ttl_seconds:
+                break
+            self._sessions.popitem(last=False)
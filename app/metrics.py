@@ -0,0 +1,170 @@
+import bisect
+import contextvars
+import logging
+import threading
+import time
+import uuid
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import CONFIG
+
+# In-process Prometheus-style metrics. Everything is a no-op when
+# `metrics.enabled` is false, so instrumented hot paths pay one bool check.
+ENABLED = bool(CONFIG.get("metrics", {}).get("enabled", True))
+
+log = logging.getLogger("app.trace")
+
+trace_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("trace_id", default="-")
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_REGISTRY: List["_Metric"] = []
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def _fmt_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        if not ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for labels, v in sorted(self._values.items()):
+                lines.append(f"{self.name}{_fmt_labels(self.labelnames, labels)} {v:g}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        self._values: Dict[Tuple[str, ...], list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not ENABLED:
+            return
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def time(self, *labels: str):
+        """Context manager observing the block's wall time (shared no-op when disabled)."""
+        return _Timer(self, labels) if ENABLED else _NOOP
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for labels, row in sorted(self._values.items()):
+                cumulative = 0
+                for bound, n in zip(self.buckets, row):
+                    cumulative += n
+                    le = _fmt_labels(self.labelnames, labels, f'le="{bound:g}"')
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                le = _fmt_labels(self.labelnames, labels, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{le} {row[-1]}")
+                lines.append(f"{self.name}_sum{_fmt_labels(self.labelnames, labels)} {row[-2]:.6f}")
+                lines.append(f"{self.name}_count{_fmt_labels(self.labelnames, labels)} {row[-1]}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Value read from a callback at scrape time (cache sizes, hit counters kept elsewhere)."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Callable[[], Optional[float]]):
+        super().__init__(name, help)
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        value = self.fn()
+        return super().render() + ([f"{self.name} {value:g}"] if value is not None else [])
+
+
+class _Timer:
+    __slots__ = ("hist", "labels", "start")
+
+    def __init__(self, hist: Histogram, labels: Tuple[str, ...]):
+        self.hist = hist
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        self.hist.observe(elapsed, *self.labels)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("trace=%s span=%s%s %.2fms", trace_id_var.get(), self.hist.name,
+                      list(self.labels), elapsed * 1000)
+        return False
+
+
+_NOOP = nullcontext()
+
+
+def render() -> str:
+    """Prometheus text exposition of every registered metric."""
+    lines: List[str] = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------
+# Metrics recorded across the app
+# ---------------------------------------------------------------------
+HTTP_SECONDS = Histogram("advisor_http_request_seconds", "HTTP request latency.", ["path", "status"])
+CHAT_ROUTES = Counter("advisor_chat_total", "Chat turns by how they were answered.", ["route"])
+AGENT_STEP_SECONDS = Histogram("advisor_agent_step_seconds", "Agent planning step latency.")
+LLM_SECONDS = Histogram("advisor_llm_seconds", "LLM call latency.", ["model", "status"])
+LLM_TOKENS = Counter("advisor_llm_tokens_total", "LLM tokens by kind.", ["model", "kind"])
+TOOL_SECONDS = Histogram("advisor_tool_seconds", "Tool invocation latency.", ["tool", "status"])
+STORE_SECONDS = Histogram("advisor_store_seconds", "Profile store operation latency.", ["op"])
+PROFILE_WRITES_SKIPPED = Counter("advisor_profile_writes_skipped_total", "Profile upserts that changed nothing.")
+PROMPT_TOKENS = Histogram("advisor_prompt_tokens", "Estimated prompt tokens per agent turn (before tool calls).",
+                          buckets=(100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000))
+TOKENS_SAVED = Counter("advisor_prompt_tokens_saved_total", "Prompt tokens removed by budgeting.", ["source"])
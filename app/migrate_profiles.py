@@ -0,0 +1,24 @@
+"""Import a directory of per-user JSON profiles into the SQLite profile store.
+
+    python -m app.migrate_profiles --src data/profiles --db data/profiles.db
+"""
+import argparse
+
+from .config import resolve_path
+from .memory import SQLiteProfileStore
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--src", default="data/profiles", help="JSON profile directory")
+    parser.add_argument("--db", default="data/profiles.db", help="SQLite database to create/update")
+    parser.add_argument("--batch-size", type=int, default=1000, help="profiles per transaction")
+    args = parser.parse_args(argv)
+
+    store = SQLiteProfileStore(resolve_path(args.db))
+    count = store.import_json_dir(resolve_path(args.src), batch_size=args.batch_size)
+    print(f"Imported {count} profiles into {store.path}")
+
+
+if __name__ == "__main__":
+    main()
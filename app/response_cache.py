@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+def _digest(obj: Any) -> str:
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def normalize_message(message: str) -> str:
+    return " ".join(message.lower().split()).rstrip(" .!?")
+
+
+class ResponseCache:
+    """Agent replies keyed on (normalized message, windowed history, profile content).
+
+    Two tiers: an in-memory LRU and an optional SQLite file shared by workers.
+    Entries expire after `ttl_seconds`; `invalidate_user` drops everything a
+    user's turns produced once their profile changes.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600, max_entries: int = 1024,
+                 disk_path: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._mem: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (stored_at, owner, text)
+        self._lock = threading.Lock()
+        self._disk_path = disk_path
+        self._local = threading.local()
+        self.hits = self.disk_hits = self.misses = 0
+        if disk_path:
+            os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+            conn = self._conn()
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key       TEXT PRIMARY KEY,
+                    owner     TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    text      TEXT NOT NULL
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS responses_owner ON responses (owner);
+            """)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._disk_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def key(message: str, history: List[Dict[str, str]], summary: str, profile_hash: str) -> str:
+        return _digest([normalize_message(message), _digest([history, summary]), profile_hash])
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry and now - entry[0] < self.ttl_seconds:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            if entry:
+                del self._mem[key]
+        if self._disk_path:
+            row = self._conn().execute(
+                "SELECT stored_at, owner, text FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[0] < self.ttl_seconds:
+                self._remember(key, row)
+                with self._lock:
+                    self.disk_hits += 1
+                return row[2]
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, text: str, owner: str) -> None:
+        entry = (time.time(), owner, text)
+        self._remember(key, entry)
+        if self._disk_path:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO responses (key, owner, stored_at, text) VALUES (?, ?, ?, ?)",
+                (key, owner, entry[0], text),
+            )
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        with self._lock:
+            self._mem[key] = entry
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.max_entries:
+                self._mem.popitem(last=False)
+
+    def invalidate_user(self, user_id: str) -> None:
+        with self._lock:
+            for key in [k for k, v in self._mem.items() if v[1] == user_id]:
+                del self._mem[key]
+        if self._disk_path:
+            self._conn().execute("DELETE FROM responses WHERE owner = ?", (user_id,))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "entries": len(self._mem),
+        }
@@ -0,0 +1,103 @@
+import re
+from typing import Any, Dict, Optional, Tuple
+
+# Pre-LLM fast path: only short, unambiguous requests that map onto a single tool
+# call are answered here. Anything else returns None and goes to the agent.
+
+MAX_WORDS = 12
+
+# Words that suggest the user wants reasoning, a what-if, or is supplying new facts.
+_AMBIGUOUS = re.compile(
+    r"\b(if|but|instead|compare|vs|versus|why|explain|assume|assuming|retire|retirement|"
+    r"married|single|kids?|children|dependents?|income|salary|earn|net worth|age)\b",
+    re.IGNORECASE,
+)
+
+_INTENTS = [
+    ("savings", re.compile(
+        r"^(?:please\s+)?(?:(?:re)?calculate|compute|estimate|show|check|update|run|get)\s+"
+        r"(?:me\s+)?(?:my\s+)?savings(?:\s+(?:rate|plan|estimate|amount))?[.!?]?$"
+        r"|^how much (?:should|can) i save[.!?]?$",
+        re.IGNORECASE,
+    )),
+    ("insurance", re.compile(
+        r"^(?:please\s+)?(?:(?:re)?calculate|recommend|estimate|show|check|update|run|get)\s+"
+        r"(?:me\s+)?(?:my\s+)?insurance(?:\s+(?:recommendations?|coverage|plan|needs))?[.!?]?$"
+        r"|^what insurance (?:do i need|should i get)[.!?]?$",
+        re.IGNORECASE,
+    )),
+    ("profile", re.compile(
+        r"^(?:please\s+)?(?:show|view|display|summari[sz]e|what(?:'s| is))\s+"
+        r"(?:me\s+)?my\s+(?:financial\s+)?profile[.!?]?$",
+        re.IGNORECASE,
+    )),
+    # Tickers must be upper-case or $-prefixed so "price of gold" is not a quote lookup.
+    ("quote", re.compile(
+        r"^(?i:(?:what(?:'s| is) the\s+)?(?:(?:stock|share|current)\s+)?(?:price|quote)\s+(?:of|for)\s+"
+        r"|(?:get|show)(?: me)?\s+(?:a\s+)?quote\s+for\s+)"
+        r"\$?(?P<symbol>[A-Z]{1,5}(?:\.[A-Z]{1,2})?)[.!?]?$"
+        r"|^\$(?P<dollar>[A-Za-z]{1,5})(?i:\s+(?:price|quote))?[.!?]?$",
+    )),
+]
+
+
+def match_intent(message: str) -> Optional[Tuple[str, Optional[str]]]:
+    """Return (intent, argument) for a high-confidence structured request, else None."""
+    text = " ".join(message.split())
+    if not text or len(text.split()) > MAX_WORDS or _AMBIGUOUS.search(text):
+        return None
+
+    matches = []
+    for name, pattern in _INTENTS:
+        m = pattern.search(text)
+        if m:
+            arg = (m.groupdict().get("symbol") or m.groupdict().get("dollar") or "").upper() or None
+            matches.append((name, arg))
+    if len(matches) != 1:
+        return None
+    name, arg = matches[0]
+    # Numbers outside a ticker usually mean the user is giving new figures.
+    if name != "quote" and re.search(r"\d", text):
+        return None
+    return name, arg
+
+
+def _amount(value: Any) -> str:
+    return f"{float(value):,.0f}"
+
+
+def render(intent: str, result: Dict[str, Any]) -> str:
+    """Templated answer for a fast-path tool result."""
+    if intent == "savings":
+        return (
+            "Based on your saved profile:\n"
+            f"- Suggested savings rate: {float(result['suggested_savings_rate']):.0%}\n"
+            f"- Annual savings: {_amount(result['annual_savings'])}\n"
+            f"- Monthly savings: {_amount(result['monthly_savings'])}\n\n"
+            "Share any changes to your income, dependents or net worth and I'll recalculate."
+        )
+    if intent == "insurance":
+        cov = result["coverage"]
+        return (
+            "Based on your saved profile:\n"
+            f"- Term life: cover of about {_amount(cov['term_life']['recommended_cover'])} "
+            f"for {cov['term_life']['term_years']} years\n"
+            f"- Health insurance priority: {cov['health']['priority']}\n"
+            f"- Disability insurance priority: {cov['disability']['priority']}\n"
+            f"- Home/auto: {cov['home_auto']['note'].lower()}"
+        )
+    if intent == "profile":
+        lines = [
+            f"- {k.replace('_', ' ').capitalize()}: {v}"
+            for k, v in result.items() if not k.startswith("_")
+        ]
+        return "Here is the profile I have on file:\n" + "\n".join(lines)
+    if intent == "quote":
+        text = (
+            f"{result['symbol']} last traded at {result['price']:,.2f} "
+            f"({result['change_percent']}) on {result['timestamp']}, volume {result['volume']:,}."
+        )
+        if result.get("stale"):
+            text += " This quote is cached and may be delayed."
+        return text
+    raise ValueError(f"Unknown intent: {intent}")
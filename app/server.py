@@ -1,9 +1,71 @@
-from fastapi import FastAPI, Body
+import json
+import logging
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Body, Request, HTTPException
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Dict, Any
-from .agent import chat, _tool_savings, _tool_insurance
+from . import metrics
+from .agent import achat, astream_chat, warmup, response_cache, tool_cache, _tool_savings, _tool_insurance
+from .batch import parse_columns, score_columns, iter_ndjson
+from .bulk import CHUNK_SIZE as BULK_CHUNK_SIZE, iter_export, process_chunk
+from .config import CONFIG
+from .token_budget import current_usage
+from .tools import model_registry
+from .tools.market_data import quote_cache
 
-app = FastAPI(title="AI Investment Advisor")
+log = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if CONFIG.get("models", {}).get("warmup_on_startup", True):
+        await run_in_threadpool(model_registry.warmup)
+    # The agent is otherwise built on the first /chat; warming up moves that cost to startup.
+    if CONFIG.get("agent", {}).get("warmup_on_startup", False):
+        try:
+            await run_in_threadpool(warmup)
+        except Exception:
+            log.exception("Agent warm-up failed; it will be retried on the first chat")
+    yield
+
+app = FastAPI(title="AI Investment Advisor", lifespan=lifespan)
+
+if response_cache is not None:
+    metrics.Gauge("advisor_response_cache_hits", "Response cache hits (memory + disk).",
+                  lambda: response_cache.hits + response_cache.disk_hits)
+    metrics.Gauge("advisor_response_cache_misses", "Response cache misses.",
+                  lambda: response_cache.misses)
+if tool_cache is not None:
+    metrics.Gauge("advisor_tool_cache_hits", "Memoized model results served.", lambda: tool_cache.hits)
+    metrics.Gauge("advisor_tool_cache_misses", "Model results computed.", lambda: tool_cache.misses)
+    metrics.Gauge("advisor_tool_cache_hit_ratio", "Tool result cache hit rate.",
+                  lambda: tool_cache.stats()["hit_rate"])
+metrics.Gauge("advisor_quote_cache_hits", "Quote cache hits.", lambda: quote_cache.hits)
+metrics.Gauge("advisor_quote_cache_misses", "Quote cache upstream fetches.", lambda: quote_cache.misses)
+metrics.Gauge("advisor_quote_cache_stale", "Stale quotes served.", lambda: quote_cache.stale)
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    # Every response carries X-Trace-Id (echoed from the request when the caller sent one).
+    trace_id = request.headers.get("x-trace-id") or metrics.new_trace_id()
+    token = metrics.trace_id_var.set(trace_id)
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        route = request.scope.get("route")
+        metrics.HTTP_SECONDS.observe(time.perf_counter() - start,
+                                     getattr(route, "path", "unmatched"), str(status))
+        metrics.trace_id_var.reset(token)
+    response.headers["X-Trace-Id"] = trace_id
+    return response
+
+NDJSON = "application/x-ndjson"
 
 class ChatIn(BaseModel):
     user_id: str
@@ -17,10 +79,29 @@ class DemographicsIn(BaseModel):
 def health():
     return {"status": "ok"}
 
+@app.get("/metrics")
+def metrics_ep():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.post("/chat")
-def chat_ep(payload: ChatIn):
-    reply = chat(payload.user_id, payload.message)
-    return {"reply": reply}
+async def chat_ep(payload: ChatIn):
+    reply = await achat(payload.user_id, payload.message)
+    # Prompt size and tokens saved by budgeting for this turn (set by achat in this context).
+    return {"reply": reply, "usage": current_usage()}
+
+async def _sse(events):
+    async for ev in events:
+        name = ev.pop("event")
+        yield f"event: {name}\ndata: {json.dumps(ev, default=str)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream_ep(payload: ChatIn):
+    """Server-Sent Events: token, tool_start, tool_end, error, done."""
+    return StreamingResponse(
+        _sse(astream_chat(payload.user_id, payload.message)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.post("/calculate_savings")
 def calc_savings(payload: DemographicsIn):
@@ -29,3 +110,83 @@ def calc_savings(payload: DemographicsIn):
 @app.post("/recommend_insurance")
 def rec_ins(payload: DemographicsIn):
     return _tool_insurance(payload.user_id, payload.demographics)
+
+# Batch endpoints read the raw body (columnar JSON or NDJSON records) instead of
+# going through pydantic, which is far too slow for hundreds of thousands of rows.
+async def _batch(kind: str, request: Request):
+    body = await request.body()
+    ndjson_in = NDJSON in request.headers.get("content-type", "")
+    try:
+        cols = await run_in_threadpool(parse_columns, body, ndjson_in)
+        scored = await run_in_threadpool(score_columns, kind, cols)
+    except (ValueError, TypeError, KeyError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if NDJSON in request.headers.get("accept", ""):
+        return StreamingResponse(iter_ndjson(kind, scored), media_type=NDJSON)
+    return Response(json.dumps(scored), media_type="application/json")
+
+@app.post("/batch/calculate_savings")
+async def batch_savings(request: Request):
+    return await _batch("savings", request)
+
+@app.post("/batch/recommend_insurance")
+async def batch_insurance(request: Request):
+    return await _batch("insurance", request)
+
+# Bulk onboarding: the body is consumed as a stream and processed chunk by chunk
+# (same pipeline as `python -m app.bulk import`). Output is spooled to a temp file
+# (on disk past a few MB) and streamed back, so memory stays flat for any size.
+async def _body_lines(request: Request):
+    buf = b""
+    async for data in request.stream():
+        buf += data
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8").rstrip("\r")
+    if buf:
+        yield buf.decode("utf-8").rstrip("\r")
+
+def _iter_file(f, block_size: int = 65536):
+    try:
+        f.seek(0)
+        while block := f.read(block_size):
+            yield block
+    finally:
+        f.close()
+
+@app.post("/bulk/import")
+async def bulk_import(request: Request, score_only: bool = False):
+    """CSV (text/csv, header row first) or NDJSON profiles in; NDJSON results and rejects out."""
+    fmt = "csv" if "csv" in request.headers.get("content-type", "") else "jsonl"
+    out = tempfile.SpooledTemporaryFile(max_size=8 << 20)
+    counts = [0, 0]
+
+    async def flush(chunk, start):
+        ok, rejects = await run_in_threadpool(process_chunk, fmt, header, chunk, start, not score_only)
+        counts[0] += len(ok)
+        counts[1] += len(rejects)
+        out.write("".join(line + "\n" for line in ok + rejects).encode("utf-8"))
+
+    lines = _body_lines(request)
+    header = None
+    if fmt == "csv":
+        async for header in lines:
+            break
+    start, chunk = (2 if fmt == "csv" else 1), []
+    async for line in lines:
+        chunk.append(line)
+        if len(chunk) >= BULK_CHUNK_SIZE:
+            await flush(chunk, start)
+            start, chunk = start + len(chunk), []
+    if chunk:
+        await flush(chunk, start)
+
+    return StreamingResponse(_iter_file(out), media_type=NDJSON,
+                             headers={"X-Accepted": str(counts[0]), "X-Rejected": str(counts[1])})
+
+@app.get("/bulk/export")
+def bulk_export(format: str = "jsonl"):
+    if format not in ("csv", "jsonl"):
+        raise HTTPException(status_code=422, detail="format must be 'csv' or 'jsonl'")
+    return StreamingResponse(iter_export(format), media_type="text/csv" if format == "csv" else NDJSON)
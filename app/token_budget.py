@@ -0,0 +1,147 @@
+import contextvars
+import functools
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import metrics
+from .config import CONFIG
+
+# Keeps what goes into each prompt bounded: tool results are stripped to the
+# fields the model uses, and history is trimmed to a token budget with the
+# overflow folded into the conversation summary.
+_tb_cfg = CONFIG.get("token_budget", {})
+ENABLED = bool(_tb_cfg.get("enabled", True))
+MAX_HISTORY_TOKENS = int(_tb_cfg.get("max_history_tokens", 1500))
+MAX_SUMMARY_TOKENS = int(_tb_cfg.get("max_summary_tokens", 300))
+DROP_TOOL_FIELDS = set(_tb_cfg.get("drop_tool_fields", ["profile", "notes"]))
+MESSAGE_OVERHEAD = 4  # role/separator tokens per chat message
+
+
+# ---------------------------------------------------------------------
+# Token counting (tiktoken when installed, ~4 chars/token otherwise)
+# ---------------------------------------------------------------------
+_encoder = None
+
+
+def _load_encoder():
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+
+            _encoder = tiktoken.get_encoding(_tb_cfg.get("encoding", "cl100k_base"))
+        except Exception:  # not installed, or the encoding file can't be fetched offline
+            _encoder = False
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    enc = _load_encoder()
+    if enc:
+        return len(enc.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+# ---------------------------------------------------------------------
+# Per-turn accounting
+# ---------------------------------------------------------------------
+class TurnUsage:
+    __slots__ = ("prompt_tokens", "saved_history", "saved_tools")
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.saved_history = 0
+        self.saved_tools = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "tokens_saved": self.saved_history + self.saved_tools,
+            "saved_history": self.saved_history,
+            "saved_tools": self.saved_tools,
+        }
+
+
+# Set per chat turn; tool threads see the same object through the copied context.
+usage_var: contextvars.ContextVar[Optional[TurnUsage]] = contextvars.ContextVar("turn_usage", default=None)
+
+
+def start_turn() -> TurnUsage:
+    usage = TurnUsage()
+    usage_var.set(usage)
+    return usage
+
+
+def current_usage() -> Optional[Dict[str, int]]:
+    usage = usage_var.get()
+    return usage.as_dict() if usage is not None else None
+
+
+def fit_history(history: List[Dict[str, str]], summary: str,
+                fold: Callable[[str, Dict[str, str]], str]) -> Tuple[List[Dict[str, str]], str]:
+    """Keep the newest messages that fit MAX_HISTORY_TOKENS; fold older ones into the summary."""
+    if not ENABLED:
+        return history, summary
+    kept, used = [], 0
+    for i in range(len(history) - 1, -1, -1):
+        cost = count_tokens(history[i]["content"]) + MESSAGE_OVERHEAD
+        if used + cost > MAX_HISTORY_TOKENS:
+            break
+        kept.append(history[i])
+        used += cost
+    kept.reverse()
+    dropped = history[:len(history) - len(kept)]
+
+    before = sum(count_tokens(m["content"]) + MESSAGE_OVERHEAD for m in dropped) + count_tokens(summary)
+    for message in dropped:
+        summary = fold(summary, message)
+    summary_tokens = count_tokens(summary)
+    if summary_tokens > MAX_SUMMARY_TOKENS:
+        # Oldest lines go first; the tail is the most recent context.
+        summary = summary[-MAX_SUMMARY_TOKENS * len(summary) // summary_tokens:]
+        summary_tokens = count_tokens(summary)
+    _record_saved("history", before - summary_tokens)
+    return kept, summary
+
+
+def compact_tool_output(result: Any) -> Any:
+    """Drop bookkeeping and boilerplate fields from a tool's dict result."""
+    if not ENABLED or not isinstance(result, dict):
+        return result
+    compact = {k: v for k, v in result.items() if k not in DROP_TOOL_FIELDS and not k.startswith("_")}
+    if len(compact) != len(result):
+        _record_saved("tools", count_tokens(json.dumps(result, default=str))
+                      - count_tokens(json.dumps(compact, default=str)))
+    return compact
+
+
+def compact_tool(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a tool function so the LLM only sees its compacted output."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return compact_tool_output(func(*args, **kwargs))
+    return wrapper
+
+
+def record_prompt(*parts: str, messages: int = 0) -> int:
+    """Estimate this turn's prompt size (system + summary + history + input)."""
+    tokens = sum(count_tokens(p) for p in parts) + messages * MESSAGE_OVERHEAD
+    usage = usage_var.get()
+    if usage is not None:
+        usage.prompt_tokens = tokens
+    metrics.PROMPT_TOKENS.observe(tokens)
+    return tokens
+
+
+def _record_saved(source: str, tokens: int) -> None:
+    if tokens <= 0:
+        return
+    metrics.TOKENS_SAVED.inc(source, amount=tokens)
+    usage = usage_var.get()
+    if usage is not None:
+        if source == "history":
+            usage.saved_history += tokens
+        else:
+            usage.saved_tools += tokens
@@ -0,0 +1,62 @@
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+
+
+class ToolResultCache:
+    """Model outputs keyed on (tool, model version, profile content hash).
+
+    In-memory LRU bounded by `max_entries`. Users with identical profiles share
+    entries; `invalidate_user` drops whatever a user's calls stored once their
+    profile changes (the new content hashes to a different key anyway). Results
+    are stored pickled, so every caller gets its own copy, nested dicts included
+    (faster than copy.deepcopy for these small dicts).
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._mem: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (owner, pickled result)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.invalidations = 0
+
+    def get_or_compute(self, tool: str, version: str, profile_hash: str, owner: str,
+                       compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """A private copy of the cached result, computing and storing it on a miss."""
+        key = (tool, version, profile_hash)
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return pickle.loads(entry[1])
+            self.misses += 1
+        result = compute()
+        if "error" not in result:
+            frozen = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+            with self._lock:
+                self._mem[key] = (owner, frozen)
+                self._mem.move_to_end(key)
+                while len(self._mem) > self.max_entries:
+                    self._mem.popitem(last=False)
+        return result
+
+    def invalidate_user(self, user_id: str) -> None:
+        with self._lock:
+            for key in [k for k, v in self._mem.items() if v[0] == user_id]:
+                del self._mem[key]
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "entries": len(self._mem),
+        }
@@ -1,4 +1,8 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
+
+import numpy as np
+
+from .rounding import round_like_python
 
 # === Replace this with your actual ML model call ===
 def recommend_insurance(demographics: Dict[str, Any]) -> Dict[str, Any]:
@@ -23,3 +27,44 @@ def recommend_insurance(demographics: Dict[str, Any]) -> Dict[str, Any]:
         },
         "notes": "Heuristic placeholder — swap with your ML model."
     }
+
+
+# === Columnar version of the same heuristic; keep the two in sync ===
+def recommend_insurance_batch(age, income, dependents, net_worth) -> Dict[str, list]:
+    """Score equal-length columns in one pass; numbers match recommend_insurance."""
+    age = np.asarray(age).astype(np.int64)
+    income = np.asarray(income, dtype=np.float64)
+    dependents = np.asarray(dependents).astype(np.int64)
+    net_worth = np.asarray(net_worth, dtype=np.float64)
+
+    life_cover = np.where(dependents > 0, np.maximum(income * 10, net_worth * 1.2), income * 5)
+    term_years = np.where(age < 50, 20, 15)
+    health_priority = np.where(age >= 40, "High", "Medium")
+    disability_priority = np.where(income > 0, "Medium", "Low")
+
+    return {
+        "term_life_cover": round_like_python(life_cover, 2),
+        "term_years": term_years.tolist(),
+        "health_priority": health_priority.tolist(),
+        "disability_priority": disability_priority.tolist(),
+    }
+
+
+def insurance_rows(columns: Dict[str, list]) -> Iterator[Dict[str, Any]]:
+    """Expand recommend_insurance_batch columns into recommend_insurance-shaped dicts."""
+    for cover, years, health, disability in zip(
+        columns["term_life_cover"], columns["term_years"],
+        columns["health_priority"], columns["disability_priority"],
+    ):
+        yield {
+            "coverage": {
+                "term_life": {
+                    "recommended_cover": cover,
+                    "term_years": years
+                },
+                "health": {"priority": health},
+                "disability": {"priority": disability},
+                "home_auto": {"note": "If applicable"}
+            },
+            "notes": "Heuristic placeholder — swap with your ML model."
+        }
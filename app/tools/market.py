@@ -1,9 +1,68 @@
-from typing import Dict, Any
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Any, List
+
+from ..config import CONFIG
+from .market_data import get_exchange_rate, get_stock_quote
+from .quote_cache import QuoteCache
+
+_snap_cfg = CONFIG.get("market_snapshot", {})
+
+# category -> symbol; crypto is priced through CURRENCY_EXCHANGE_RATE against USD.
+DEFAULT_INSTRUMENTS = [
+    {"category": "equities", "symbol": "SPY"},
+    {"category": "bonds", "symbol": "AGG"},
+    {"category": "gold", "symbol": "GLD"},
+    {"category": "crypto", "symbol": "BTC", "kind": "crypto"},
+]
+INSTRUMENTS: List[Dict[str, str]] = _snap_cfg.get("instruments") or DEFAULT_INSTRUMENTS
+SOURCE_TIMEOUT = float(_snap_cfg.get("timeout_seconds", 3))
+
+# Sources are fetched in parallel; a slow one is reported as timed out while its
+# fetch keeps running and lands in the quote cache for the next snapshot.
+_executor = ThreadPoolExecutor(max_workers=int(_snap_cfg.get("max_workers", 8)),
+                               thread_name_prefix="market-snapshot")
+# The assembled snapshot is shared by all users for a short window (no rate limit:
+# each source already goes through the quote cache and token bucket).
+snapshot_cache = QuoteCache(ttl_seconds=float(_snap_cfg.get("ttl_seconds", 30)))
+
+
+def _fetch_one(instrument: Dict[str, str]) -> Dict[str, Any]:
+    if instrument.get("kind") == "crypto":
+        return get_exchange_rate(instrument["symbol"], instrument.get("market", "USD"))
+    return get_stock_quote(instrument["symbol"])
+
+
+def _build_snapshot() -> Dict[str, Any]:
+    futures = {_executor.submit(_fetch_one, inst): inst for inst in INSTRUMENTS}
+    wait(futures, timeout=SOURCE_TIMEOUT)
+
+    snapshot: Dict[str, Any] = {}
+    errors = []
+    for future, inst in futures.items():
+        if not future.done():
+            future.cancel()
+            result = {"error": f"Timed out after {SOURCE_TIMEOUT:g}s"}
+        elif future.exception() is not None:
+            result = {"error": str(future.exception())}
+        else:
+            result = future.result()
+        if "error" in result:
+            errors.append(result["error"])
+        snapshot.setdefault(inst["category"], {})[inst["symbol"]] = result
+
+    snapshot["as_of"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    snapshot["partial"] = bool(errors)
+    if len(errors) == len(futures):
+        # Nothing usable: don't cache it, and let the last good snapshot be served as stale.
+        snapshot["error"] = "Market data unavailable: " + "; ".join(dict.fromkeys(errors))
+    return snapshot
+
+
 def market_snapshot() -> Dict[str, Any]:
-    # Stub for demo; wire a real data source later
-    return {
-        "equities": {"SPY": "snapshot unavailable in demo"},
-        "bonds": {"AGG": "snapshot unavailable in demo"},
-        "gold": {"GLD": "snapshot unavailable in demo"},
-        "crypto": {"BTC": "snapshot unavailable in demo"}
-    }
+    """Quotes for the configured instruments, fetched concurrently and shared for `ttl_seconds`.
+
+    Sources that fail or exceed `timeout_seconds` carry an "error" entry and the
+    snapshot is marked "partial".
+    """
+    return snapshot_cache.get("snapshot", _build_snapshot)
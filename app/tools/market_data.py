@@ -1,34 +1,133 @@
 import os
-from alpha_vantage.timeseries import TimeSeries
-from dotenv import load_dotenv
+import requests
+from requests.adapters import HTTPAdapter
 
-load_dotenv()
+from ..config import CONFIG, resolve_path
+from .quote_cache import QuoteCache, TokenBucket
+from .timeseries_cache import FIELDS, TimeSeriesCache, parse_series
 
 ALPHAVANTAGE_KEY = os.getenv("ALPHAVANTAGE_API_KEY")
 
+_md_cfg = CONFIG.get("market_data", {})
+BASE_URL = os.getenv("ALPHAVANTAGE_BASE_URL", _md_cfg.get("base_url", "https://www.alphavantage.co/query"))
+TIMEOUT = float(_md_cfg.get("timeout_seconds", 10))
+
+# One pooled keep-alive session for every Alpha Vantage call in this process.
+_session = requests.Session()
+_pool = int(_md_cfg.get("pool_size", 10))
+_session.mount("http://", HTTPAdapter(pool_connections=_pool, pool_maxsize=_pool))
+_session.mount("https://", HTTPAdapter(pool_connections=_pool, pool_maxsize=_pool))
+
+limiter = TokenBucket(
+    rate=float(_md_cfg.get("rate_limit_per_minute", 5)) / 60.0,
+    burst=int(_md_cfg.get("rate_limit_burst", 5)),
+)
+quote_cache = QuoteCache(
+    ttl_seconds=float(_md_cfg.get("quote_ttl_seconds", 60)),
+    limiter=limiter,
+    max_entries=int(_md_cfg.get("quote_cache_size", 1024)),
+    error_ttl_seconds=float(_md_cfg.get("quote_error_ttl_seconds", 30)),
+)
+
+
+def _query(**params) -> dict:
+    """GET one Alpha Vantage function; quota/notice payloads are raised as errors."""
+    params["apikey"] = ALPHAVANTAGE_KEY
+    resp = _session.get(BASE_URL, params=params, timeout=TIMEOUT)
+    resp.raise_for_status()
+    data = resp.json()
+    for key in ("Error Message", "Note", "Information"):
+        if key in data:
+            raise RuntimeError(data[key])
+    return data
+
+
+def _fetch_quote(symbol: str) -> dict:
+    data = _query(function="GLOBAL_QUOTE", symbol=symbol).get("Global Quote") or {}
+    if not data:
+        return {"error": f"No quote found for {symbol}"}
+    return {
+        "symbol": symbol,
+        "price": float(data["05. price"]),
+        "volume": int(data["06. volume"]),
+        "change_percent": data["10. change percent"],
+        "timestamp": data["07. latest trading day"],
+    }
+
+
 def get_stock_quote(symbol: str) -> dict:
-    """Fetch the latest real-time quote for a given stock symbol."""
+    """Fetch the latest real-time quote for a given stock symbol (cached per symbol for the TTL)."""
+    if not ALPHAVANTAGE_KEY:
+        return {"error": "Missing Alpha Vantage API key. Please set ALPHAVANTAGE_API_KEY in .env."}
+
+    symbol = symbol.strip().upper()
+    return quote_cache.get(f"quote:{symbol}", lambda: _fetch_quote(symbol))
+
+
+def _fetch_exchange_rate(from_currency: str, to_currency: str) -> dict:
+    data = _query(function="CURRENCY_EXCHANGE_RATE", from_currency=from_currency,
+                  to_currency=to_currency).get("Realtime Currency Exchange Rate") or {}
+    if not data:
+        return {"error": f"No exchange rate found for {from_currency}/{to_currency}"}
+    return {
+        "symbol": f"{from_currency}/{to_currency}",
+        "price": float(data["5. Exchange Rate"]),
+        "timestamp": data["6. Last Refreshed"],
+    }
+
+
+def get_exchange_rate(from_currency: str, to_currency: str = "USD") -> dict:
+    """Latest crypto/FX rate (e.g. BTC -> USD), cached like stock quotes."""
     if not ALPHAVANTAGE_KEY:
         return {"error": "Missing Alpha Vantage API key. Please set ALPHAVANTAGE_API_KEY in .env."}
 
-    try:
-        ts = TimeSeries(key=ALPHAVANTAGE_KEY, output_format='json')
-        data, meta = ts.get_quote_endpoint(symbol)
-        return {
-            "symbol": symbol.upper(),
-            "price": float(data["05. price"]),
-            "volume": int(data["06. volume"]),
-            "change_percent": data["10. change percent"],
-            "timestamp": data["07. latest trading day"],
-        }
-    except Exception as e:
-        return {"error": str(e)}
-    
-def get_stock_timeseries(symbol: str, interval="daily"):
-    """Fetch historical stock price data."""
-    ts = TimeSeries(key=ALPHAVANTAGE_KEY, output_format='pandas')
+    from_currency, to_currency = from_currency.strip().upper(), to_currency.strip().upper()
+    return quote_cache.get(f"fx:{from_currency}:{to_currency}",
+                           lambda: _fetch_exchange_rate(from_currency, to_currency))
+
+
+def _download_series(symbol: str, interval: str, outputsize: str) -> tuple:
+    if not limiter.try_acquire():
+        raise RuntimeError("Quote rate limit reached; try again shortly.")
     if interval == "intraday":
-        data, _ = ts.get_intraday(symbol=symbol, interval='60min', outputsize='compact')
-    else:
-        data, _ = ts.get_daily(symbol=symbol, outputsize='compact')
+        data = _query(function="TIME_SERIES_INTRADAY", symbol=symbol, interval="60min",
+                      outputsize=outputsize)
+        return parse_series(data["Time Series (60min)"])
+    data = _query(function="TIME_SERIES_DAILY", symbol=symbol, outputsize=outputsize)
+    return parse_series(data["Time Series (Daily)"])
+
+
+def _fetch_series(symbol: str, interval: str, last_ts) -> tuple:
+    """Download the compact series; TimeSeriesCache keeps only bars after last_ts."""
+    if not ALPHAVANTAGE_KEY:
+        raise RuntimeError("Missing Alpha Vantage API key. Please set ALPHAVANTAGE_API_KEY in .env.")
+    # The first download may be "full"; refreshes only need the latest bars.
+    outputsize = _md_cfg.get("timeseries_outputsize", "compact") if last_ts is None else "compact"
+    ts, bars = _download_series(symbol, interval, outputsize)
+    if last_ts is not None and len(ts) and ts[0] > last_ts:
+        # The last ~100 bars don't reach back to the cache (it is older than that):
+        # appending them would leave a silent gap, so fetch the full history instead.
+        ts, bars = _download_series(symbol, interval, "full")
+    return ts, bars
+
+
+timeseries_cache = TimeSeriesCache(
+    base_dir=resolve_path(_md_cfg.get("timeseries_dir", "data/timeseries")),
+    fetch=_fetch_series,
+    refresh_seconds=float(_md_cfg.get("timeseries_refresh_seconds", 3600)),
+)
+
+
+def read_timeseries(symbol: str, interval="daily", start=None, end=None):
+    """Cached (timestamps, OHLCV bars) as zero-copy array views, oldest first."""
+    return timeseries_cache.get(symbol.strip().upper(), interval, start, end)
+
+
+def get_stock_timeseries(symbol: str, interval="daily", start=None, end=None):
+    """Fetch historical stock price data (newest first, Alpha Vantage column names)."""
+    import pandas as pd
+
+    ts, bars = read_timeseries(symbol, interval, start, end)
+    data = pd.DataFrame(bars[::-1], index=pd.to_datetime(ts[::-1], unit="s"), columns=FIELDS)
+    data.index.name = "date"
     return data
@@ -0,0 +1,251 @@
+"""Load-once model registry with a micro-batching front end.
+
+Every scorer (single-user tools, /batch endpoints, bulk import) gets its model
+from here, so plugging in a real model means registering a loader:
+
+    models:
+      savings:
+        loader: mypkg.savings:load   # load(cfg) -> object with predict_batch() and rows()
+        weights: models/savings.npy  # optional, memory-mapped read-only
+        version: "2024-06"           # part of the tool-result cache key
+
+A model exposes predict_batch(age, income, dependents, net_worth) -> columns
+and rows(columns) -> per-user dicts shaped like the single-user tool output;
+an optional predict_one(demographics) is used when a batch holds one request.
+"""
+import importlib
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from ..config import CONFIG, resolve_path
+from .savings_model import predict_savings_amount, predict_savings_batch, savings_rows
+from .insurance_model import recommend_insurance, recommend_insurance_batch, insurance_rows
+
+FEATURES = ["age", "income", "dependents", "net_worth"]
+# Converted like the scalar models do (int("2") works, int("two") does not).
+FEATURE_TYPES = {"age": int, "income": float, "dependents": int, "net_worth": float}
+
+_models_cfg = CONFIG.get("models", {})
+
+
+class HeuristicModel:
+    """Adapter for the built-in heuristics (columnar and scalar forms give identical numbers)."""
+
+    version = "heuristic"
+
+    def __init__(self, predict_batch: Callable[..., Dict[str, list]],
+                 rows: Callable[[Dict[str, list]], Iterator[Dict[str, Any]]],
+                 predict_one: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        self.predict_batch = predict_batch
+        self.rows = rows
+        self.predict_one = predict_one
+
+
+def load_weights(path: str) -> np.ndarray:
+    """Memory-map a .npy file read-only; forked workers share the pages."""
+    return np.load(resolve_path(path), mmap_mode="r")
+
+
+# ---------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------
+_loaders: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "savings": lambda cfg: HeuristicModel(predict_savings_batch, savings_rows,
+                                          predict_savings_amount),
+    "insurance": lambda cfg: HeuristicModel(recommend_insurance_batch, insurance_rows,
+                                            recommend_insurance),
+}
+_models: Dict[str, Any] = {}
+_generations: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def register(name: str, loader: Callable[[Dict[str, Any]], Any]) -> None:
+    """Register (or replace) the loader for `name`; the next get_model() reloads it."""
+    with _lock:
+        _loaders[name] = loader
+        _models.pop(name, None)
+        _generations[name] = _generations.get(name, 0) + 1
+
+
+def _load(name: str) -> Any:
+    cfg = dict(_models_cfg.get(name) or {})
+    loader = _loaders[name]
+    if cfg.get("loader"):
+        module, _, attr = cfg["loader"].partition(":")
+        loader = getattr(importlib.import_module(module), attr)
+    if cfg.get("weights"):
+        cfg["weights"] = load_weights(cfg["weights"])
+    return loader(cfg)
+
+
+def get_model(name: str) -> Any:
+    """The process-wide instance of `name`, loaded on first use."""
+    model = _models.get(name)
+    if model is None:
+        with _lock:
+            model = _models.get(name)
+            if model is None:
+                model = _models[name] = _load(name)
+    return model
+
+
+def model_version(name: str) -> str:
+    """Identifies the loaded model; changes whenever its loader is re-registered."""
+    model = get_model(name)
+    version = getattr(model, "version", None) or (_models_cfg.get(name) or {}).get("version")
+    return f"{version or 'unversioned'}.{_generations.get(name, 0)}"
+
+
+def feature_row(demographics: Dict[str, Any]) -> List[Any]:
+    """The model inputs of one profile in FEATURES order; ValueError names a bad field."""
+    row = []
+    for k in FEATURES:
+        value = demographics.get(k, 0)
+        try:
+            row.append(FEATURE_TYPES[k](value))
+        except (TypeError, ValueError):
+            raise ValueError(f"{k} must be a number, got {value!r}") from None
+    return row
+
+
+def _predict_single(model: Any, demographics: Dict[str, Any]) -> Dict[str, Any]:
+    if hasattr(model, "predict_one"):
+        return model.predict_one(demographics)
+    return next(iter(model.rows(model.predict_batch(*([v] for v in feature_row(demographics))))))
+
+
+def warmup(names: Optional[List[str]] = None) -> None:
+    """Load the models and score one dummy row so first requests don't pay for it."""
+    for name in names or list(_loaders):
+        model = get_model(name)
+        list(model.rows(model.predict_batch([30], [1_000_000.0], [1], [500_000.0])))
+
+
+# ---------------------------------------------------------------------
+# Micro-batching
+# ---------------------------------------------------------------------
+class MicroBatcher:
+    """Coalesces concurrent single-row predictions into one predict_batch call.
+
+    A call that finds nothing else in flight is scored inline in the caller's
+    thread, so an idle service pays neither the batching delay nor the thread
+    hand-off. Otherwise a background thread drains the queue; when the previous
+    batch held more than one request (i.e. there is concurrency) it waits up to
+    `max_wait_ms` for more before scoring, otherwise it scores immediately.
+    """
+
+    def __init__(self, name: str, max_batch: int = 64, max_wait_ms: float = 2.0):
+        self.name = name
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = self.rows_scored = 0
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._inflight = 0
+        self._inflight_lock = threading.Lock()
+
+    def _ensure_worker(self) -> None:
+        # Threads don't survive fork: (re)start the worker in each process.
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._queue: "queue.Queue" = queue.Queue()
+                self._busy = False
+                threading.Thread(target=self._run, name=f"batcher-{self.name}", daemon=True).start()
+                self._pid = os.getpid()
+
+    def submit(self, demographics: Dict[str, Any]) -> Future:
+        future: Future = Future()
+        try:
+            features = feature_row(demographics)
+        except ValueError as e:
+            # Rejected before batching, so a bad value only fails its own request.
+            future.set_exception(e)
+            return future
+        self._ensure_worker()
+        self._queue.put((demographics, features, future))
+        return future
+
+    def predict(self, demographics: Dict[str, Any]) -> Dict[str, Any]:
+        with self._inflight_lock:
+            inline = self._inflight == 0
+            self._inflight += 1
+        try:
+            if inline:
+                return _predict_single(get_model(self.name), demographics)
+            return self.submit(demographics).result()
+        finally:
+            with self._inflight_lock:
+                self._inflight -= 1
+
+    def _run(self) -> None:
+        q = self._queue
+        while True:
+            batch = [q.get()]
+            deadline = time.monotonic() + (self.max_wait if self._busy else 0.0)
+            while len(batch) < self.max_batch:
+                try:
+                    timeout = deadline - time.monotonic()
+                    batch.append(q.get(timeout=timeout) if timeout > 0 else q.get_nowait())
+                except queue.Empty:
+                    break
+            self._busy = len(batch) > 1
+            self._score(batch)
+
+    def _score(self, batch) -> None:
+        try:
+            model = get_model(self.name)
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        if len(batch) == 1:
+            self._score_each(model, batch)
+            return
+        try:
+            cols = [list(col) for col in zip(*(features for _, features, _ in batch))]
+            rows = list(model.rows(model.predict_batch(*cols)))
+        except Exception:
+            # Don't let one request the model chokes on fail the rest of the batch.
+            self._score_each(model, batch)
+            return
+        self.batches += 1
+        self.rows_scored += len(batch)
+        for (_, _, future), row in zip(batch, rows):
+            future.set_result(row)
+
+    def _score_each(self, model: Any, batch) -> None:
+        for demographics, _, future in batch:
+            try:
+                future.set_result(_predict_single(model, demographics))
+            except Exception as e:
+                future.set_exception(e)
+        self.batches += len(batch)
+        self.rows_scored += len(batch)
+
+
+_batch_cfg = _models_cfg.get("micro_batch", {})
+_batchers: Dict[str, MicroBatcher] = {}
+
+
+def predict(name: str, demographics: Dict[str, Any]) -> Dict[str, Any]:
+    """Score one user with model `name`, batched with concurrent callers when enabled."""
+    if not _batch_cfg.get("enabled", True):
+        return _predict_single(get_model(name), demographics)
+    batcher = _batchers.get(name)
+    if batcher is None:
+        with _lock:
+            batcher = _batchers.setdefault(name, MicroBatcher(
+                name,
+                max_batch=int(_batch_cfg.get("max_batch", 64)),
+                max_wait_ms=float(_batch_cfg.get("max_wait_ms", 2)),
+            ))
+    return batcher.predict(demographics)
@@ -0,0 +1,182 @@
+import threading
+from collections import OrderedDict
+from functools import reduce
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .market_data import read_timeseries
+
+CLOSE = 3  # column of the close price in the cached OHLCV bars
+PERIODS_PER_YEAR = {"daily": 252, "intraday": 252 * 7}
+
+
+class PortfolioAnalytics:
+    """Returns, volatility, drawdowns and correlation for a set of holdings.
+
+    All symbols are aligned on their common timestamps. State is kept as running
+    sums (sum r, r'r, compounded wealth and peaks, last `window` returns), so
+    `update()` folds in newly appended bars in O(new bars x N^2) instead of
+    recomputing the whole history.
+    """
+
+    def __init__(self, weights: Dict[str, float], window: int = 21, interval: str = "daily",
+                 reader: Callable[..., Tuple[np.ndarray, np.ndarray]] = read_timeseries):
+        if not weights:
+            raise ValueError("Portfolio needs at least one holding.")
+        self.symbols = [s.strip().upper() for s in weights]
+        w = np.array([float(v) for v in weights.values()])
+        if (w < 0).any() or w.sum() <= 0:
+            raise ValueError("Weights must be non-negative and not all zero.")
+        self.weights = w / w.sum()
+        self.window = window
+        self.interval = interval
+        self.periods_per_year = PERIODS_PER_YEAR.get(interval, 252)
+        self.reader = reader
+        self.last_ts: Optional[int] = None
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        n = len(self.symbols)
+        self.count = 0
+        self.sum_r = np.zeros(n)
+        self.sum_rr = np.zeros((n, n))
+        self.last_prices: Optional[np.ndarray] = None
+        self.wealth = np.ones(n + 1)  # assets + portfolio (last column)
+        self.peak = np.ones(n + 1)
+        self.max_drawdown = np.zeros(n + 1)
+        self.recent = np.empty((0, n + 1))
+
+    # -----------------------------------------------------------------
+    # Data alignment and incremental update
+    # -----------------------------------------------------------------
+    def _aligned_closes(self, start=None) -> Tuple[np.ndarray, np.ndarray]:
+        series = [self.reader(s, self.interval, start) for s in self.symbols]
+        common = reduce(np.intersect1d, (ts for ts, _ in series))
+        closes = np.empty((len(common), len(series)))
+        for j, (ts, bars) in enumerate(series):
+            closes[:, j] = bars[np.searchsorted(ts, common), CLOSE]
+        return common, closes
+
+    def update(self) -> int:
+        """Fold in bars newer than the last one seen; returns how many were added."""
+        start = None
+        if self.last_ts is not None:
+            start = np.datetime64(self.last_ts + 1, "s")
+        ts, closes = self._aligned_closes(start)
+        if len(ts) == 0:
+            return 0
+        if self.last_prices is not None:
+            closes = np.vstack([self.last_prices, closes])
+        elif len(ts) < 2:
+            return 0
+        else:
+            ts = ts[1:]  # the first bar only seeds the price level
+        r = closes[1:] / closes[:-1] - 1.0
+
+        self.count += len(r)
+        self.sum_r += r.sum(axis=0)
+        self.sum_rr += r.T @ r
+
+        full = np.hstack([r, (r @ self.weights)[:, None]])
+        path = self.wealth * np.cumprod(1.0 + full, axis=0)
+        peaks = np.maximum(np.maximum.accumulate(path, axis=0), self.peak)
+        self.max_drawdown = np.minimum(self.max_drawdown, (path / peaks - 1.0).min(axis=0))
+        self.wealth, self.peak = path[-1], peaks[-1]
+        self.recent = np.vstack([self.recent, full])[-self.window:]
+
+        self.last_prices = closes[-1]
+        self.last_ts = int(ts[-1])
+        return len(r)
+
+    def refresh(self) -> Dict[str, Any]:
+        """update() then summary(), serialized per instance."""
+        with self._lock:
+            self.update()
+            return self.summary()
+
+    # -----------------------------------------------------------------
+    # Derived statistics
+    # -----------------------------------------------------------------
+    def covariance(self) -> np.ndarray:
+        """Sample covariance of per-period returns (N x N)."""
+        n = self.count
+        if n < 2:
+            return np.full((len(self.symbols),) * 2, np.nan)
+        mean = self.sum_r / n
+        return (self.sum_rr - n * np.outer(mean, mean)) / (n - 1)
+
+    def correlation(self) -> np.ndarray:
+        cov = self.covariance()
+        sd = np.sqrt(np.diag(cov))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return cov / np.outer(sd, sd)
+
+    def summary(self, top_pairs: int = 5) -> Dict[str, Any]:
+        if self.count < 2:
+            return {"error": "Not enough overlapping price history for these symbols."}
+        ppy = self.periods_per_year
+        w = self.weights
+        cov = self.covariance()
+        corr = self.correlation()
+        asset_vol = np.sqrt(np.diag(cov) * ppy)
+        port_vol = float(np.sqrt(w @ cov @ w * ppy))
+        mean = self.sum_r / self.count * ppy
+        rolling = self.recent.std(axis=0, ddof=1) * np.sqrt(ppy) if len(self.recent) > 1 \
+            else np.full(len(w) + 1, np.nan)
+
+        iu = np.triu_indices(len(w), k=1)
+        pair_corr = corr[iu]
+        order = np.argsort(pair_corr)[::-1][:top_pairs]
+
+        return {
+            "as_of": str(np.datetime64(self.last_ts, "s")),
+            "observations": self.count,
+            "assets": {
+                s: {
+                    "weight": round(float(w[i]), 4),
+                    "annual_return": round(float(mean[i]), 4),
+                    "annual_volatility": round(float(asset_vol[i]), 4),
+                    "rolling_volatility": round(float(rolling[i]), 4),
+                    "max_drawdown": round(float(self.max_drawdown[i]), 4),
+                }
+                for i, s in enumerate(self.symbols)
+            },
+            "portfolio": {
+                "annual_return": round(float(w @ mean), 4),
+                "annual_volatility": round(port_vol, 4),
+                "rolling_volatility": round(float(rolling[-1]), 4),
+                "max_drawdown": round(float(self.max_drawdown[-1]), 4),
+                "current_drawdown": round(float(self.wealth[-1] / self.peak[-1] - 1), 4),
+            },
+            "diversification": {
+                "diversification_ratio": round(float(w @ asset_vol / port_vol), 4) if port_vol else None,
+                "effective_holdings": round(float(1 / (w @ w)), 2),
+                "average_correlation": round(float(pair_corr.mean()), 4) if len(pair_corr) else None,
+                "most_correlated_pairs": [
+                    [self.symbols[iu[0][k]], self.symbols[iu[1][k]], round(float(pair_corr[k]), 4)]
+                    for k in order
+                ],
+            },
+        }
+
+
+# Analytics objects are kept per (holdings, interval, window) so repeat questions
+# only pay for bars appended since the last call.
+_cache: "OrderedDict[tuple, PortfolioAnalytics]" = OrderedDict()
+_cache_lock = threading.Lock()
+MAX_CACHED = 256
+
+
+def analyze_portfolio(holdings: Dict[str, float], interval: str = "daily",
+                      window: int = 21) -> Dict[str, Any]:
+    key = (tuple(sorted((s.strip().upper(), float(v)) for s, v in holdings.items())), interval, window)
+    with _cache_lock:
+        analytics = _cache.pop(key, None)
+        if analytics is None:
+            analytics = PortfolioAnalytics(holdings, window=window, interval=interval)
+        _cache[key] = analytics
+        while len(_cache) > MAX_CACHED:
+            _cache.popitem(last=False)
+    return analytics.refresh()
@@ -1,13 +1,65 @@
-from typing import Dict, Any
-from ..memory import JSONProfileStore
+import hashlib
+import json
+import threading
+import zlib
+from typing import Callable, Dict, Any, List, Sequence, Tuple
+from ..config import CONFIG
+from ..metrics import PROFILE_WRITES_SKIPPED, STORE_SECONDS
+from ..memory import make_profile_store
 
-_store = JSONProfileStore()
+_store = make_profile_store(CONFIG.get("profile_store", {}))
+_listeners: List[Callable[[str], None]] = []
+
+# Striped per-user locks: tool calls running in parallel (or concurrent requests)
+# for the same user serialize their read-modify-write, other users don't contend.
+_LOCK_STRIPES = 64
+_locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+
+def _user_lock(user_id: str) -> threading.Lock:
+    return _locks[zlib.crc32(str(user_id).encode("utf-8")) % _LOCK_STRIPES]
+
+def profile_hash(profile: Dict[str, Any]) -> str:
+    """Canonical hash of a profile's content, ignoring bookkeeping keys like _updated_at."""
+    content = {k: v for k, v in (profile or {}).items() if not k.startswith("_")}
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def iter_profiles():
+    """Yield (user_id, profile) for every stored profile, one at a time."""
+    return _store.iter_profiles()
+
+def use_store(store) -> None:
+    """Swap the backing store (benchmarks, migrations, tests)."""
+    global _store
+    _store = store
+
+def on_profile_change(callback: Callable[[str], None]) -> None:
+    """Register callback(user_id), called after an upsert changes a profile's content."""
+    _listeners.append(callback)
 
 def upsert_profile(user_id: str, profile: Dict[str, Any]) -> Dict[str, Any]:
-    current = _store.load(user_id)
-    current.update(profile or {})
-    _store.save(user_id, current)
+    """Merge `profile` into the stored one; nothing is written when no field changes."""
+    with _user_lock(user_id), STORE_SECONDS.time("upsert"):
+        stored = _store.load(user_id)
+        if stored and all(k in stored and stored[k] == v for k, v in (profile or {}).items()):
+            PROFILE_WRITES_SKIPPED.inc()
+            return stored
+        before = profile_hash(stored) if _listeners else None
+        current = _store.upsert(user_id, profile)
+        changed = _listeners and profile_hash(current) != before
+    if changed:
+        for callback in _listeners:
+            callback(user_id)
     return current
 
+def upsert_profiles(items: Sequence[Tuple[str, Dict[str, Any]]]) -> int:
+    """Bulk upsert (one transaction on SQLite).
+
+    Change listeners are not called: cached replies are keyed on the profile hash,
+    so entries for changed profiles stop matching and age out on their own.
+    """
+    with STORE_SECONDS.time("upsert_many"):
+        return _store.upsert_many(items)
+
 def get_profile(user_id: str) -> Dict[str, Any]:
-    return _store.load(user_id)
+    with STORE_SECONDS.time("load"):
+        return _store.load(user_id)
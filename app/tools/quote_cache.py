@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+class TokenBucket:
+    """Client-side rate limiter: `rate` tokens per second, at most `burst` banked."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+
+
+class QuoteCache:
+    """Shared TTL cache with in-flight request coalescing.
+
+    Concurrent misses for the same key wait on a single upstream fetch. When the
+    limiter is out of tokens, or the fetch fails, the last good value is served
+    with "stale": True; with nothing cached an error dict is returned instead.
+    A failed fetch's answer is reused for `error_ttl_seconds`, so repeating an
+    unknown symbol doesn't spend a limiter token each time. Keys come from user
+    input, so both maps are LRUs bounded by `max_entries`.
+    """
+
+    def __init__(self, ttl_seconds: float, limiter: Optional[TokenBucket] = None,
+                 wait_timeout: float = 30.0, max_entries: int = 1024,
+                 error_ttl_seconds: float = 30.0):
+        self.ttl_seconds = ttl_seconds
+        self.limiter = limiter
+        self.wait_timeout = wait_timeout
+        self.max_entries = max_entries
+        self.error_ttl_seconds = error_ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (fetched_at, value)
+        self._failures: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (failed_at, result)
+        self._inflight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.stale = 0
+
+    def get(self, key: str, fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            entry = self._entries.get(key)
+            if entry and now - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[1])
+            failure = self._failures.get(key)
+            if failure and now - failure[0] < self.error_ttl_seconds:
+                self.hits += 1
+                return dict(failure[1])
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                if self.limiter and not self.limiter.try_acquire():
+                    return self._stale(entry, "Quote rate limit reached; try again shortly.")
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+
+        if not leader:
+            if not flight.done.wait(self.wait_timeout):
+                return {"error": f"Timed out waiting for {key}"}
+            return dict(flight.result)
+
+        try:
+            result = fetch()
+        except Exception as e:
+            result = {"error": str(e)}
+        with self._lock:
+            if "error" in result:
+                result = self._stale(self._entries.get(key), result["error"])
+                self._put(self._failures, key, result)
+            else:
+                self._failures.pop(key, None)
+                self._put(self._entries, key, result)
+            del self._inflight[key]
+        flight.result = result
+        flight.done.set()
+        return dict(result)
+
+    def _put(self, entries: "OrderedDict[str, tuple]", key: str, value: Dict[str, Any]) -> None:
+        entries[key] = (time.monotonic(), value)
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def _stale(self, entry, error: str) -> Dict[str, Any]:
+        if entry is None:
+            return {"error": error}
+        self.stale += 1
+        return {**entry[1], "stale": True}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._failures.clear()
@@ -0,0 +1,95 @@
+from typing import Dict, Any, Optional, Sequence
+
+import numpy as np
+
+
+def _running_sum(a: np.ndarray) -> np.ndarray:
+    """In-place cumulative sum down axis 0 (years); one contiguous row add per year,
+    several times faster than np.cumsum(axis=0) on these wide arrays."""
+    for t in range(1, len(a)):
+        np.add(a[t - 1], a[t], out=a[t])
+    return a
+
+
+# === Monte Carlo retirement projection (real terms, annual steps) ===
+def project_retirement(
+    demographics: Dict[str, Any],
+    annual_savings: float,
+    retirement_age: int = 60,
+    life_expectancy: int = 90,
+    annual_spending: Optional[float] = None,
+    replacement_ratio: float = 0.7,
+    expected_return: float = 0.06,
+    volatility: float = 0.12,
+    n_paths: int = 20_000,
+    seed: Optional[int] = None,
+    percentiles: Sequence[float] = (10, 50, 90),
+) -> Dict[str, Any]:
+    """Simulate wealth paths from today to life expectancy in one array pass.
+
+    Contributions of `annual_savings` are made until retirement, then
+    `annual_spending` (default: replacement_ratio x income) is withdrawn each
+    year. Yearly gross returns are lognormal with the given mean and volatility.
+    Success means a path is never depleted before life expectancy.
+    """
+    age = int(demographics.get("age", 0))
+    income = float(demographics.get("income", 0))
+    wealth0 = float(demographics.get("net_worth", 0))
+    if annual_spending is None:
+        annual_spending = income * replacement_ratio
+
+    years = max(life_expectancy - age, 1)
+    working = min(max(retirement_age - age, 0), years)
+    flows = np.full(years, -float(annual_spending))
+    flows[:working] = annual_savings
+
+    # Lognormal gross returns with E[1 + r] = 1 + expected_return and sd = volatility.
+    # Arrays are (years, paths), so the running sums below add whole contiguous
+    # rows (see _running_sum). Antithetic pairs share one set of float32 draws: the mirrored path's
+    # cumulative log growth is drift - S_t for the drawn path's drift + S_t, so
+    # only half the paths are drawn and summed.
+    sigma2 = np.log1p((volatility / (1 + expected_return)) ** 2)
+    mu = np.log1p(expected_return) - sigma2 / 2
+    rng = np.random.default_rng(seed)
+    half = (n_paths + 1) // 2
+    shocks = rng.standard_normal((years, half), dtype=np.float32)
+    _running_sum(shocks)
+    shocks *= np.float32(np.sqrt(sigma2))
+    drift = (mu * np.arange(1, years + 1, dtype=np.float32))[:, None]
+    growth = np.empty((years, n_paths), dtype=np.float32)
+    np.add(drift, shocks, out=growth[:, :half])
+    np.subtract(drift, shocks[:, :n_paths - half], out=growth[:, half:])
+    np.exp(growth, out=growth)  # G_t: cumulative growth factor to end of year t
+
+    # W_t = W_{t-1} * g_t + c_t  ==>  W_t = G_t * (W_0 + sum_{s<=t} c_s / G_s)
+    wealth = np.divide(flows.astype(np.float32)[:, None], growth)
+    _running_sum(wealth)
+    wealth += np.float32(wealth0)
+    wealth *= growth
+    # Returns are always > -100%, so once a path goes negative it stays negative:
+    # the last year's sign tells whether it was ever depleted, and clipping at zero
+    # gives the true (floored) balance.
+    success = float(np.mean(wealth[-1] > 0))
+
+    milestones = sorted({min(t, years - 1) for t in range(4, years, 5)} | {max(working - 1, 0), years - 1})
+    at_milestones = np.maximum(wealth[milestones], 0)
+    bands = np.percentile(at_milestones, percentiles, axis=1)
+
+    return {
+        "success_probability": round(success, 4),
+        "retirement_age": retirement_age,
+        "life_expectancy": life_expectancy,
+        "annual_contribution": round(float(annual_savings), 2),
+        "annual_spending": round(float(annual_spending), 2),
+        "assumptions": {
+            "expected_return": expected_return,
+            "volatility": volatility,
+            "paths": n_paths,
+            "seed": seed,
+            "real_terms": True,
+        },
+        "percentile_bands": [
+            {"age": age + t + 1, **{f"p{p:g}": round(float(v)) for p, v in zip(percentiles, bands[:, i])}}
+            for i, t in enumerate(milestones)
+        ],
+    }
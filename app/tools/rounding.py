@@ -0,0 +1,19 @@
+import numpy as np
+
+
+def round_like_python(values: np.ndarray, ndigits: int) -> list:
+    """Vectorized round(v, ndigits) for every element, returned as a list of floats.
+
+    rint(v * 10**n) / 10**n gives the same double as Python's correctly rounded
+    round() except where v * 10**n lands within float error of a .5 tie (or is
+    too large to scale exactly); only those elements fall back to round().
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0 ** ndigits
+    scaled = values * scale
+    out = np.rint(scaled) / scale
+    tie_gap = np.abs(scaled - np.floor(scaled) - 0.5)
+    suspect = (tie_gap <= np.maximum(1e-6, np.abs(scaled) * 1e-15)) | (np.abs(scaled) >= 2.0 ** 52)
+    for i in np.flatnonzero(suspect).tolist():
+        out[i] = round(float(values[i]), ndigits)
+    return out.tolist()
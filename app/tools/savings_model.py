@@ -1,4 +1,8 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
+
+import numpy as np
+
+from .rounding import round_like_python
 
 # === Replace this with your actual ML model call ===
 def predict_savings_amount(demographics: Dict[str, Any]) -> Dict[str, Any]:
@@ -23,3 +27,39 @@ def predict_savings_amount(demographics: Dict[str, Any]) -> Dict[str, Any]:
         "monthly_savings": round(monthly, 2),
         "notes": "Heuristic placeholder — swap with your ML model."
     }
+
+
+# === Columnar version of the same heuristic; keep the two in sync ===
+def predict_savings_batch(age, income, dependents, net_worth) -> Dict[str, list]:
+    """Score equal-length columns in one pass; numbers match predict_savings_amount."""
+    income = np.asarray(income, dtype=np.float64)
+    net_worth = np.asarray(net_worth, dtype=np.float64)
+    dependents = np.asarray(dependents).astype(np.int64)
+    age = np.asarray(age).astype(np.int64)
+
+    base_rate = np.where(dependents <= 1, 0.18, 0.14)
+    base_rate = np.where(net_worth < income * 1.5, base_rate + 0.02, base_rate)
+    base_rate = np.where(age < 35, base_rate + 0.01, base_rate)
+
+    annual = income * base_rate
+    monthly = annual / 12.0
+
+    # Rounded exactly like round() so every value is identical to the scalar path.
+    return {
+        "suggested_savings_rate": round_like_python(base_rate, 4),
+        "annual_savings": round_like_python(annual, 2),
+        "monthly_savings": round_like_python(monthly, 2),
+    }
+
+
+def savings_rows(columns: Dict[str, list]) -> Iterator[Dict[str, Any]]:
+    """Expand predict_savings_batch columns into predict_savings_amount-shaped dicts."""
+    for rate, annual, monthly in zip(
+        columns["suggested_savings_rate"], columns["annual_savings"], columns["monthly_savings"]
+    ):
+        yield {
+            "suggested_savings_rate": rate,
+            "annual_savings": annual,
+            "monthly_savings": monthly,
+            "notes": "Heuristic placeholder — swap with your ML model."
+        }
@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl  # cross-process append lock (POSIX only)
+except ImportError:
+    fcntl = None
+
+# Column order of the OHLCV matrix, matching Alpha Vantage's field names.
+FIELDS = ["1. open", "2. high", "3. low", "4. close", "5. volume"]
+
+Fetcher = Callable[[str, str, Optional[int]], Tuple[np.ndarray, np.ndarray]]
+
+
+class TimeSeriesCache:
+    """Append-only on-disk price history, one directory per symbol/interval.
+
+    Each series is two raw little-endian files — `ts.bin` (int64 epoch seconds,
+    ascending) and `bars.bin` (float64 rows of FIELDS) — plus `meta.json` holding
+    the committed row count. Refreshes append only bars newer than the last
+    cached timestamp; readers memory-map the files and get views, never copies.
+    """
+
+    def __init__(self, base_dir: str, fetch: Fetcher, refresh_seconds: float = 3600):
+        self.base_dir = base_dir
+        self.fetch = fetch
+        self.refresh_seconds = refresh_seconds
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _dir(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.base_dir, interval, symbol.upper())
+
+    def _meta(self, path: str) -> dict:
+        try:
+            with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"count": 0, "last_ts": None, "fetched_at": 0}
+
+    def _lock(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    # -----------------------------------------------------------------
+    # Read path
+    # -----------------------------------------------------------------
+    def read(self, symbol: str, interval: str = "daily",
+             start: Optional[np.datetime64] = None,
+             end: Optional[np.datetime64] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Zero-copy (timestamps, bars) views for start <= ts <= end."""
+        path = self._dir(symbol, interval)
+        count = self._meta(path)["count"]
+        if count == 0:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(FIELDS)), dtype=np.float64)
+        ts = np.memmap(os.path.join(path, "ts.bin"), dtype="<i8", mode="r", shape=(count,))
+        bars = np.memmap(os.path.join(path, "bars.bin"), dtype="<f8", mode="r",
+                         shape=(count, len(FIELDS)))
+        lo = 0 if start is None else int(np.searchsorted(ts, _epoch(start), side="left"))
+        hi = count if end is None else int(np.searchsorted(ts, _epoch(end), side="right"))
+        return ts[lo:hi], bars[lo:hi]
+
+    # -----------------------------------------------------------------
+    # Refresh path
+    # -----------------------------------------------------------------
+    def refresh(self, symbol: str, interval: str = "daily", force: bool = False) -> int:
+        """Fetch and append bars newer than the cache; returns the number appended."""
+        path = self._dir(symbol, interval)
+        with self._lock(path):
+            os.makedirs(path, exist_ok=True)
+            with open(os.path.join(path, ".lock"), "a") as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                meta = self._meta(path)
+                if not force and time.time() - meta["fetched_at"] < self.refresh_seconds:
+                    return 0
+                ts, bars = self.fetch(symbol, interval, meta["last_ts"])
+                if meta["last_ts"] is not None:
+                    newer = ts > meta["last_ts"]
+                    ts, bars = ts[newer], bars[newer]
+                self._append(path, meta, ts, bars)
+                return len(ts)
+
+    def _append(self, path: str, meta: dict, ts: np.ndarray, bars: np.ndarray) -> None:
+        # Truncate any rows a crashed writer left past the committed count, then append.
+        for name, data, row_bytes in (("ts.bin", ts.astype("<i8"), 8),
+                                      ("bars.bin", bars.astype("<f8"), 8 * len(FIELDS))):
+            with open(os.path.join(path, name), "ab") as f:
+                f.truncate(meta["count"] * row_bytes)
+                f.write(np.ascontiguousarray(data).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        meta = {
+            "count": meta["count"] + len(ts),
+            "last_ts": int(ts[-1]) if len(ts) else meta["last_ts"],
+            "fetched_at": time.time(),
+        }
+        tmp = os.path.join(path, "meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(path, "meta.json"))
+
+    def get(self, symbol: str, interval: str = "daily",
+            start: Optional[np.datetime64] = None,
+            end: Optional[np.datetime64] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Refresh if the cache is older than refresh_seconds, then read."""
+        try:
+            self.refresh(symbol, interval)
+        except Exception:
+            if self._meta(self._dir(symbol, interval))["count"] == 0:
+                raise
+            # Upstream unavailable or over quota: serve what is cached.
+        return self.read(symbol, interval, start, end)
+
+
+def _epoch(value) -> int:
+    return int(np.datetime64(value, "s").astype(np.int64))
+
+
+def parse_series(series: Dict[str, Dict[str, str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Alpha Vantage {"YYYY-MM-DD[ HH:MM:SS]": {"1. open": ...}} -> ascending arrays."""
+    keys = sorted(series)
+    ts = np.array(keys, dtype="datetime64[s]").astype(np.int64)
+    bars = np.array([[float(series[k][f]) for f in FIELDS] for k in keys], dtype=np.float64)
+    return ts, bars.reshape(len(keys), len(FIELDS))
@@ -0,0 +1,59 @@
+"""Shared helpers for storing benchmark results as JSON baselines and checking regressions."""
+import json
+import os
+import platform
+import sys
+from typing import Dict, List, Tuple
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+
+def baseline_path(name: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def load_baseline(name: str) -> Dict[str, float]:
+    try:
+        with open(baseline_path(name), "r", encoding="utf-8") as f:
+            return json.load(f)["results"]
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(name: str, results: Dict[str, float]) -> None:
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    with open(baseline_path(name), "w", encoding="utf-8") as f:
+        json.dump({
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=2, sort_keys=True)
+
+
+def regressions(results: Dict[str, float], baseline: Dict[str, float],
+                threshold: float) -> List[Tuple[str, float, float]]:
+    """Metrics (lower is better) that grew by more than `threshold` (0.2 = +20%)."""
+    return [
+        (k, baseline[k], v) for k, v in results.items()
+        if k in baseline and baseline[k] > 0 and v > baseline[k] * (1 + threshold)
+    ]
+
+
+def finish(name: str, results: Dict[str, float], update: bool, threshold: float) -> int:
+    """Print results against the baseline; returns a process exit code."""
+    baseline = load_baseline(name)
+    for k, v in sorted(results.items()):
+        base = baseline.get(k)
+        delta = f"  ({(v / base - 1) * 100:+.1f}% vs baseline)" if base else ""
+        print(f"{k:<48} {v:>14.6g}{delta}")
+    if update:
+        save_baseline(name, results)
+        print(f"Baseline written to {baseline_path(name)}")
+        return 0
+    if not baseline:
+        print(f"No baseline at {baseline_path(name)}; run with --update to record one.")
+        return 0
+    bad = regressions(results, baseline, threshold)
+    for k, base, v in bad:
+        print(f"REGRESSION {k}: {base:.6g} -> {v:.6g} (threshold +{threshold:.0%})")
+    return 1 if bad else 0
@@ -0,0 +1,52 @@
+"""Deterministic offline stand-in for ChatOpenAI/ChatBedrock.
+
+Messages mentioning savings and/or insurance get one tool call per tool (both in
+one step when both are mentioned; the app runs them for the chatting user), the
+tool results are echoed back as the final answer, and anything else gets a canned reply.
+"""
+import itertools
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+class FakeChatModel(BaseChatModel):
+    latency_s: float = 0.0
+    counter: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-deterministic"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs) -> ChatResult:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        if self.counter is None:
+            self.counter = itertools.count()
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            results = []
+            for m in reversed(messages):
+                if not isinstance(m, ToolMessage):
+                    break
+                results.insert(0, str(m.content)[:200])
+            msg = AIMessage(content="Here is what the model found: " + " | ".join(results))
+        else:
+            text = str(last.content).lower()
+            tools = [name for key, name in (("sav", "savings_model"), ("insur", "insurance_model"))
+                     if key in text]
+            if tools:
+                msg = AIMessage(content="", tool_calls=[
+                    {"name": name, "args": {}, "id": f"call_{next(self.counter)}"}
+                    for name in tools
+                ])
+            else:
+                msg = AIMessage(content="This is a deterministic benchmark answer.")
+        return ChatResult(generations=[ChatGeneration(message=msg)])
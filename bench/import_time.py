@@ -0,0 +1,53 @@
+"""Cold import / startup benchmark for app.agent and app.server.
+
+Each measurement runs in a fresh interpreter so nothing is already imported.
+
+    python -m bench.import_time            # compare with bench/baselines/import_time.json
+    python -m bench.import_time --update   # record a new baseline
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from ._baseline import finish
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+SNIPPETS = {
+    "import_app_agent_s": "import app.agent",
+    "import_app_server_s": "import app.server",
+    # Import plus the lazy first-chat build (LLM client, tools, AgentExecutor); no network.
+    "first_agent_build_s": "import app.agent; app.agent.warmup()",
+}
+
+
+def measure(code: str) -> float:
+    prog = (
+        "import time; t = time.perf_counter(); "
+        f"{code}; "
+        "print(time.perf_counter() - t)"
+    )
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "sk-bench"))
+    out = subprocess.run([sys.executable, "-c", prog], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown (0.25 = +25%%)")
+    parser.add_argument("--update", action="store_true", help="write results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = {
+        name: statistics.median(measure(code) for _ in range(args.repeat))
+        for name, code in SNIPPETS.items()
+    }
+    return finish("import_time", results, args.update, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
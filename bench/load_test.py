@@ -0,0 +1,280 @@
+"""End-to-end load test of one app.server worker against local stub backends.
+
+Starts the stub LLM (bench/stub_llm_server.py) and stub quote server, runs
+`uvicorn app.server:app` in a subprocess pointed at them with a throwaway config
+and profile directory, then drives mixed /chat, /calculate_savings and
+/recommend_insurance traffic at each concurrency level and reports throughput,
+p50/p95/p99 latency and error rate per endpoint.
+
+    python -m bench.load_test --concurrency 1,8,32 --duration 20 --llm-latency-ms 400
+    python -m bench.load_test --replay sessions.jsonl --json load.json
+
+A replay file has one recorded request per line,
+{"session": "s1", "endpoint": "/chat", "body": {"user_id": "u1", "message": "..."}};
+each virtual user replays whole sessions in order. Without one, sessions are
+synthesized from --mix. The load generator shares the machine with the server,
+so compare runs on the same host only.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+import yaml
+
+from .stub_llm_server import load_script, start_stub_llm_server
+from .stub_quote_server import start_stub_quote_server
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Messages the router answers without the LLM, ones the stub LLM turns into tool
+# calls, and plain agent turns.
+CHAT_MESSAGES = [
+    "show my profile",
+    "recalculate my savings",
+    "How much should I save now that my rent went up by 10%?",
+    "Do I need more insurance cover with a second child on the way?",
+    "Check my savings and insurance, I just changed jobs.",
+    "What is the difference between an index fund and an ETF?",
+    "How should I think about risk at my age?",
+]
+
+CHAT_ERROR_PREFIX = "⚠️ Error"
+
+Request = Tuple[str, Dict[str, Any]]
+
+
+# ---------------------------------------------------------------------
+# Traffic
+# ---------------------------------------------------------------------
+def _demographics(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "age": rng.randint(22, 65),
+        "marital_status": rng.choice(["single", "married"]),
+        "dependents": rng.randint(0, 3),
+        "income": float(rng.randrange(300_000, 5_000_000, 10_000)),
+        "net_worth": float(rng.randrange(0, 20_000_000, 10_000)),
+        "location": rng.choice(["Mumbai", "Pune", "Austin", "Leeds"]),
+    }
+
+
+def synthetic_sessions(n_users: int, mix: Dict[str, float], turns: int,
+                       seed: int = 0) -> List[List[Request]]:
+    """One session per user: a profile-creating tool call, then `turns` requests drawn from `mix`."""
+    rng = random.Random(seed)
+    endpoints, weights = zip(*mix.items())
+    sessions = []
+    for i in range(n_users):
+        user_id = f"load_{i}"
+        demo = _demographics(rng)
+        session: List[Request] = [("/calculate_savings", {"user_id": user_id, "demographics": demo})]
+        for _ in range(turns):
+            endpoint = rng.choices(endpoints, weights)[0]
+            if endpoint == "/chat":
+                session.append((endpoint, {"user_id": user_id, "message": rng.choice(CHAT_MESSAGES)}))
+            else:
+                if rng.random() < 0.3:  # an updated figure now and then
+                    demo = {**demo, "income": demo["income"] * 1.05}
+                session.append((endpoint, {"user_id": user_id, "demographics": demo}))
+        sessions.append(session)
+    return sessions
+
+
+def replay_sessions(path: str) -> List[List[Request]]:
+    grouped: Dict[str, List[Request]] = defaultdict(list)
+    with open(path, "r", encoding="utf-8") as f:
+        for n, line in enumerate(f):
+            if line.strip():
+                rec = json.loads(line)
+                grouped[str(rec.get("session", n))].append((rec["endpoint"], rec.get("body", {})))
+    return list(grouped.values())
+
+
+# ---------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _write_config(tmp: str) -> str:
+    src = os.path.join(ROOT, "config.yaml")
+    if not os.path.exists(src):
+        src = os.path.join(ROOT, "config.example.yaml")
+    with open(src, "r", encoding="utf-8") as f:
+        cfg = yaml.safe_load(f) or {}
+    cfg["provider"] = "openai"
+    cfg.setdefault("openai", {})["model"] = "stub"
+    cfg["profile_store"] = {**cfg.get("profile_store", {}), "backend": "json",
+                            "json_dir": os.path.join(tmp, "profiles")}
+    cfg.setdefault("agent", {})["warmup_on_startup"] = True
+    cfg.setdefault("response_cache", {})["disk_path"] = None
+    path = os.path.join(tmp, "config.yaml")
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(cfg, f)
+    return path
+
+
+def start_server(port: int, config_path: str, llm_url: str, quote_url: str) -> subprocess.Popen:
+    env = dict(os.environ, ADVISOR_CONFIG=config_path, OPENAI_API_KEY="sk-load-test",
+               OPENAI_BASE_URL=llm_url, OPENAI_API_BASE=llm_url, ALPHAVANTAGE_BASE_URL=quote_url,
+               ALPHAVANTAGE_API_KEY="stub")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.server:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", "1", "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"app.server exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("app.server did not become healthy within 60s")
+
+
+# ---------------------------------------------------------------------
+# Load generation
+# ---------------------------------------------------------------------
+async def _virtual_user(client: httpx.AsyncClient, sessions: List[List[Request]], cursor: List[int],
+                        deadline: float, samples: Dict[str, List[Tuple[float, bool]]]) -> None:
+    while time.monotonic() < deadline:
+        session = sessions[cursor[0] % len(sessions)]
+        cursor[0] += 1
+        for endpoint, body in session:
+            if time.monotonic() >= deadline:
+                return
+            start = time.perf_counter()
+            try:
+                resp = await client.post(endpoint, json=body)
+                data = resp.json()
+                # /chat answers 200 even when the agent failed; the reply says so.
+                ok = (resp.status_code < 400 and "error" not in data
+                      and not str(data.get("reply", "")).startswith(CHAT_ERROR_PREFIX))
+            except (httpx.HTTPError, ValueError, AttributeError):
+                ok = False
+            samples[endpoint].append((time.perf_counter() - start, ok))
+
+
+async def run_level(base_url: str, sessions: List[List[Request]], concurrency: int,
+                    duration: float, timeout: float) -> Dict[str, Dict[str, float]]:
+    samples: Dict[str, List[Tuple[float, bool]]] = defaultdict(list)
+    cursor = [0]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        started = time.monotonic()
+        deadline = started + duration
+        await asyncio.gather(*(_virtual_user(client, sessions, cursor, deadline, samples)
+                               for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+    return summarize(samples, elapsed)
+
+
+def summarize(samples: Dict[str, List[Tuple[float, bool]]],
+              elapsed: float) -> Dict[str, Dict[str, float]]:
+    report = {}
+    everything = [s for rows in samples.values() for s in rows]
+    for endpoint, rows in sorted(samples.items()) + [("all", everything)]:
+        if not rows:
+            continue
+        latencies = np.array([t for t, _ in rows]) * 1e3
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        report[endpoint] = {
+            "requests": len(rows),
+            "rps": len(rows) / elapsed,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "error_rate": sum(1 for _, ok in rows if not ok) / len(rows),
+        }
+    return report
+
+
+def print_report(results: Dict[int, Dict[str, Dict[str, float]]]) -> None:
+    print(f"{'conc':>5} {'endpoint':<22} {'reqs':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'errors':>7}")
+    for concurrency, report in results.items():
+        for endpoint, r in report.items():
+            print(f"{concurrency:>5} {endpoint:<22} {r['requests']:>7} {r['rps']:>8.1f} "
+                  f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} "
+                  f"{r['error_rate']:>7.1%}")
+
+
+def _parse_mix(text: str) -> Dict[str, float]:
+    names = {"chat": "/chat", "savings": "/calculate_savings", "insurance": "/recommend_insurance"}
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[names.get(name.strip(), name.strip())] = float(weight or 1)
+    return mix
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated levels")
+    parser.add_argument("--duration", type=float, default=15, help="seconds per level")
+    parser.add_argument("--warmup", type=float, default=3, help="unmeasured seconds before the first level")
+    parser.add_argument("--mix", default="chat=2,savings=1,insurance=1")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=6, help="requests per synthetic session")
+    parser.add_argument("--replay", help="JSONL of recorded requests (replaces --mix sessions)")
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=10)
+    parser.add_argument("--quote-latency-ms", type=float, default=50)
+    parser.add_argument("--script", help="tool-call script for the stub LLM (JSON)")
+    parser.add_argument("--url", help="load an already running server instead of starting one")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--json", help="also write the results here")
+    args = parser.parse_args(argv)
+
+    sessions = (replay_sessions(args.replay) if args.replay
+                else synthetic_sessions(args.users, _parse_mix(args.mix), args.turns))
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    proc: Optional[subprocess.Popen] = None
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.url:
+            base_url = args.url.rstrip("/")
+        else:
+            llm = start_stub_llm_server(latency_ms=args.llm_latency_ms, token_ms=args.token_ms,
+                                        script=load_script(args.script))
+            quotes = start_stub_quote_server(latency_ms=args.quote_latency_ms)
+            port = _free_port()
+            proc = start_server(port, _write_config(tmp), llm.base_url, quotes.base_url)
+            base_url = f"http://127.0.0.1:{port}"
+        try:
+            if args.warmup:
+                asyncio.run(run_level(base_url, sessions, max(levels), args.warmup, args.timeout))
+            results = {c: asyncio.run(run_level(base_url, sessions, c, args.duration, args.timeout))
+                       for c in levels}
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait(timeout=10)
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""Offline micro-benchmarks: models, portfolio analytics, PII redaction, profile stores, memory, chat().
+
+Runs without network or API keys: chat() is driven by bench.fake_llm and all
+profile I/O goes to a temporary directory.
+
+    python -m bench.micro                  # small scale, compare with baseline
+    python -m bench.micro --scale full     # up to 1M rows / 100k stored profiles
+    python -m bench.micro --update         # record a new baseline
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+import numpy as np
+
+from ._baseline import finish
+
+SCALES = {
+    "small": {"rows": [1_000, 10_000, 100_000], "profiles": [1_000], "history": [100, 10_000]},
+    "full": {"rows": [1_000, 10_000, 100_000, 1_000_000], "profiles": [1_000, 100_000],
+             "history": [100, 10_000, 1_000_000]},
+}
+
+PROFILE = {"age": 30, "marital_status": "single", "dependents": 2,
+           "income": 2500000, "net_worth": 120000, "location": "Mumbai"}
+
+
+def per_call(fn: Callable[[], object], min_time: float = 0.2, rounds: int = 5) -> float:
+    """Median seconds per call over `rounds`, each running at least `min_time`."""
+    fn()
+    iters, elapsed = 1, 0.0
+    while elapsed < min_time / rounds:
+        iters *= 2
+        start = time.perf_counter()
+        for _ in range(iters):
+            fn()
+        elapsed = time.perf_counter() - start
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iters):
+            fn()
+        samples.append((time.perf_counter() - start) / iters)
+    return statistics.median(samples)
+
+
+def peak_kb(fn: Callable[[], object]) -> float:
+    """Peak traced allocation of one call, in KiB."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn()
+        return (tracemalloc.get_traced_memory()[1] - base) / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def bench_models(results: Dict[str, float], rows) -> None:
+    from app.tools.savings_model import predict_savings_amount, predict_savings_batch
+    from app.tools.insurance_model import recommend_insurance, recommend_insurance_batch
+    from app.tools.retirement_model import project_retirement
+
+    results["models.predict_savings_amount.us"] = per_call(lambda: predict_savings_amount(PROFILE)) * 1e6
+    results["models.recommend_insurance.us"] = per_call(lambda: recommend_insurance(PROFILE)) * 1e6
+    for paths in (20_000, 50_000):  # default (config retirement.paths), and a heavier run
+        results[f"models.project_retirement[{paths}].ms"] = per_call(
+            lambda: project_retirement(PROFILE, 425000, n_paths=paths, seed=0), min_time=1.0) * 1e3
+
+    rng = np.random.default_rng(0)
+    for n in rows:
+        cols = (rng.integers(18, 90, n), rng.uniform(0, 1e7, n),
+                rng.integers(0, 5, n), rng.uniform(0, 2e7, n))
+        for name, fn in (("savings", predict_savings_batch), ("insurance", recommend_insurance_batch)):
+            t = per_call(lambda: fn(*cols), min_time=0.5 if n >= 100_000 else 0.2, rounds=3)
+            results[f"models.{name}_batch[{n}].us_per_row"] = t / n * 1e6
+            results[f"models.{name}_batch[{n}].peak_kb"] = peak_kb(lambda: fn(*cols))
+
+    # Registry front end: a lone call scores inline, concurrent ones are micro-batched.
+    from concurrent.futures import ThreadPoolExecutor
+    from app.tools import model_registry
+
+    results["models.registry_predict.us"] = per_call(
+        lambda: model_registry.predict("savings", PROFILE)) * 1e6
+    with ThreadPoolExecutor(32) as pool:
+        results["models.registry_predict[32 threads].us_per_call"] = per_call(
+            lambda: list(pool.map(lambda _: model_registry.predict("insurance", PROFILE), range(256))),
+            rounds=3) / 256 * 1e6
+
+
+def bench_redaction(results: Dict[str, float]) -> None:
+    from app.guardrails import redact_pii, StreamRedactor
+
+    clean = ("I'm 34, married with two kids, earning about 2400000 a year with 1500000 saved "
+             "and a net worth of 9000000000. How much should I put away each month, and do I "
+             "need more life cover?")
+    with_pii = ("I'm 34, reach me at priya.k@example.com or +91 98765 43210. My PAN is ABCPK1234F "
+                "and card 4111 1111 1111 1111; salary goes to account no 001234567890.")
+    # Regression check: bare 10-digit amounts starting 6-9 are not phone numbers.
+    assert redact_pii(clean) == clean, redact_pii(clean)
+    results["guardrails.redact_pii[clean].us"] = per_call(lambda: redact_pii(clean)) * 1e6
+    results["guardrails.redact_pii[pii].us"] = per_call(lambda: redact_pii(with_pii)) * 1e6
+
+    reply = (clean + " " + with_pii + " ") * 10
+    tokens = [reply[i:i + 4] for i in range(0, len(reply), 4)]
+
+    def stream():
+        r = StreamRedactor()
+        for t in tokens:
+            r.feed(t)
+        r.flush()
+
+    results["guardrails.stream_redactor.us_per_token"] = per_call(stream) / len(tokens) * 1e6
+
+
+def bench_portfolio(results: Dict[str, float], holdings=(10, 50), bars: int = 2520) -> None:
+    from app.tools.portfolio import PortfolioAnalytics
+
+    rng = np.random.default_rng(0)
+    ts_all = (np.datetime64("2015-01-01", "s") + np.arange(bars + 1) * 86400).astype(np.int64)
+    for n in holdings:
+        prices = 100 * np.cumprod(1 + rng.normal(0.0003, 0.01, (bars + 1, n)), axis=0)
+        series = {}
+        for j in range(n):
+            ohlcv = np.zeros((bars + 1, 5))
+            ohlcv[:, 3] = prices[:, j]
+            series[f"S{j}"] = ohlcv
+        visible = [bars]  # how many bars the fake cache currently holds
+
+        def reader(symbol, interval, start=None):
+            ts, data = ts_all[:visible[0]], series[symbol][:visible[0]]
+            i = 0 if start is None else np.searchsorted(ts, np.datetime64(start, "s").astype(np.int64))
+            return ts[i:], data[i:]
+
+        weights = {s: 1.0 for s in series}
+
+        def full():
+            a = PortfolioAnalytics(weights, reader=reader)
+            a.update()
+            a.summary()
+
+        warm = PortfolioAnalytics(weights, reader=reader)
+        warm.update()
+        seen = (warm.last_ts, warm.last_prices)
+
+        def incremental():
+            # Fold in one new bar, then rewind the cursor so every call sees one again.
+            visible[0] = bars + 1
+            warm.refresh()
+            visible[0] = bars
+            warm.last_ts, warm.last_prices = seen
+        results[f"portfolio[{n}x{bars}].full.ms"] = per_call(full, rounds=3) * 1e3
+        results[f"portfolio[{n}x{bars}].incremental.ms"] = per_call(incremental) * 1e3
+
+
+def bench_stores(results: Dict[str, float], sizes) -> None:
+    from app.memory import JSONProfileStore, SQLiteProfileStore
+
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            stores = {
+                "json": JSONProfileStore(os.path.join(tmp, "json")),
+                "sqlite": SQLiteProfileStore(os.path.join(tmp, "profiles.db")),
+            }
+            stores["json"].save("seed", PROFILE)
+            for i in range(n):
+                stores["sqlite"].upsert(f"user_{i}", PROFILE)
+            # JSON files are independent, so one seeded file measures the same path;
+            # write the rest only so directory size matches.
+            for i in range(n):
+                stores["json"].save(f"user_{i}", PROFILE)
+
+            for kind, store in stores.items():
+                uid = f"user_{n // 2}"
+                results[f"store.{kind}[{n}].load.us"] = per_call(lambda: store.load(uid)) * 1e6
+                results[f"store.{kind}[{n}].save.us"] = per_call(lambda: store.save(uid, PROFILE)) * 1e6
+                results[f"store.{kind}[{n}].upsert.us"] = per_call(
+                    lambda: store.upsert(uid, {"income": 2600000})) * 1e6
+
+
+def bench_upsert_profile(results: Dict[str, float]) -> None:
+    from app.memory import JSONProfileStore
+    from app.tools import profile_store
+
+    with tempfile.TemporaryDirectory() as tmp:
+        profile_store.use_store(JSONProfileStore(tmp))
+        results["profile_store.upsert_profile.us"] = per_call(
+            lambda: profile_store.upsert_profile("bench_user", PROFILE)) * 1e6
+        # Unchanged upserts are skipped; alternate a field to time the write path as well.
+        incomes = itertools.cycle([PROFILE["income"], PROFILE["income"] + 1])
+        results["profile_store.upsert_profile[changed].us"] = per_call(
+            lambda: profile_store.upsert_profile("bench_user", {**PROFILE, "income": next(incomes)})) * 1e6
+
+
+def bench_memory(results: Dict[str, float], histories) -> None:
+    from app.memory import ConversationBuffer, SessionManager
+
+    for h in histories:
+        buf = ConversationBuffer(window=6)
+        for i in range(h):
+            buf.add("human" if i % 2 == 0 else "ai", f"message {i} " * 20)
+        msg = "another message " * 20
+        results[f"memory.buffer_add[history={h}].us"] = per_call(lambda: buf.add("human", msg)) * 1e6
+        results[f"memory.buffer_get[history={h}].us"] = per_call(buf.get) * 1e6
+        results[f"memory.buffer[history={h}].peak_kb"] = peak_kb(lambda: buf.add("ai", msg))
+
+    sessions = SessionManager(max_sessions=10_000)
+    for i in range(10_000):
+        sessions.get(f"user_{i}")
+    results["memory.session_get[10000].us"] = per_call(lambda: sessions.get("user_5000")) * 1e6
+
+
+def bench_chat(results: Dict[str, float]) -> None:
+    from app.memory import JSONProfileStore
+    from app.tools import profile_store
+    import app.agent as agent
+    from .fake_llm import FakeChatModel
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        profile_store.use_store(JSONProfileStore(tmp))
+        profile_store.upsert_profile("bench_user", PROFILE)
+        agent.set_agent(agent.build_agent(FakeChatModel()))
+        caches = agent.response_cache, agent.tool_cache
+
+        # Both caches off, so every call pays for the whole turn (the tool call
+        # included); the tool-cache variant shows what repeat calls cost.
+        agent.response_cache = agent.tool_cache = None
+        try:
+            # Falls through the router: one tool call and two fake LLM turns per chat().
+            results["chat.agent_tool_call.ms"] = per_call(
+                lambda: agent.chat("bench_user", "Could you look at my savings situation"), rounds=3) * 1e3
+            results["chat.agent_no_tool.ms"] = per_call(
+                lambda: agent.chat("bench_user", "Tell me about index funds"), rounds=3) * 1e3
+            results["chat.fast_path.ms"] = per_call(
+                lambda: agent.chat("bench_user", "show my profile"), rounds=3) * 1e3
+            agent.tool_cache = caches[1]
+            if agent.tool_cache is not None:
+                results["chat.agent_tool_call[tool_cache].ms"] = per_call(
+                    lambda: agent.chat("bench_user", "Could you look at my savings situation"),
+                    rounds=3) * 1e3
+        finally:
+            agent.response_cache, agent.tool_cache = caches
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--only", help="comma-separated groups: models,portfolio,redaction,stores,upsert,memory,chat")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown (0.2 = +20%%)")
+    parser.add_argument("--update", action="store_true", help="write results as the new baseline")
+    args = parser.parse_args(argv)
+
+    scale = SCALES[args.scale]
+    groups = {
+        "models": lambda r: bench_models(r, scale["rows"]),
+        "portfolio": bench_portfolio,
+        "redaction": bench_redaction,
+        "stores": lambda r: bench_stores(r, scale["profiles"]),
+        "upsert": bench_upsert_profile,
+        "memory": lambda r: bench_memory(r, scale["history"]),
+        "chat": bench_chat,
+    }
+    selected = args.only.split(",") if args.only else list(groups)
+    results: Dict[str, float] = {}
+    for name in selected:
+        groups[name](results)
+    return finish(f"micro_{args.scale}", results, args.update, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
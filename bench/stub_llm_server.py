@@ -0,0 +1,178 @@
+"""Local stand-in for the OpenAI chat completions API.
+
+Replies follow a tool-call script: every rule whose `match` substring occurs in
+the latest user message contributes its tool calls, all in one step; once tool
+results come back, the `final` template is returned. Profile tools take no
+user_id (the app runs them for the chatting user); single-input tools
+(market_snapshot, stock_quote) take their argument as `__arg1`. Both plain and
+streamed (`stream: true`) completions are supported, with configurable latency.
+
+    python -m bench.stub_llm_server --port 8766 --latency-ms 300 --token-ms 20
+    OPENAI_BASE_URL=http://127.0.0.1:8766/v1 OPENAI_API_KEY=stub ...
+
+A script file is JSON shaped like DEFAULT_SCRIPT.
+"""
+import argparse
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+DEFAULT_SCRIPT: Dict[str, Any] = {
+    "rules": [
+        {"match": "sav", "tool_calls": [{"name": "savings_model", "args": {}}]},
+        {"match": "insur", "tool_calls": [{"name": "insurance_model", "args": {}}]},
+        {"match": "retire", "tool_calls": [{"name": "retirement_projection", "args": {}}]},
+        {"match": "market", "tool_calls": [{"name": "market_snapshot", "args": {"__arg1": ""}}]},
+    ],
+    "final": "Based on the model output: {tool_results}",
+    "default": "Long-term, diversified investing with an emergency fund first is a sound starting point.",
+}
+
+
+def _text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):  # content parts
+        return " ".join(p.get("text", "") for p in content if isinstance(p, dict))
+    return str(content)
+
+
+def script_reply(script: Dict[str, Any], messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The assistant message (content and/or tool_calls) the script prescribes."""
+    if messages and messages[-1].get("role") == "tool":
+        results = []
+        for m in reversed(messages):
+            if m.get("role") != "tool":
+                break
+            results.insert(0, _text(m)[:200])
+        return {"content": script["final"].replace("{tool_results}", " | ".join(results))}
+
+    user_msgs = [m for m in messages if m.get("role") == "user"]
+    last = _text(user_msgs[-1]).lower() if user_msgs else ""
+
+    calls = []
+    for rule in script["rules"]:
+        if rule["match"].lower() in last:
+            for call in rule["tool_calls"]:
+                calls.append({"name": call["name"], "arguments": json.dumps(call.get("args", {}))})
+    if calls:
+        return {"content": None, "tool_calls": calls}
+    return {"content": script["default"]}
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json({"error": {"message": f"Unsupported path {self.path}"}}, status=404)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        with server.lock:
+            server.calls += 1
+            n = next(server.ids)
+        reply = script_reply(server.script, body.get("messages", []))
+        tool_calls = [
+            {"id": f"call_{n}_{i}", "type": "function",
+             "function": {"name": c["name"], "arguments": c["arguments"]}}
+            for i, c in enumerate(reply.get("tool_calls") or [])
+        ]
+        finish = "tool_calls" if tool_calls else "stop"
+        base = {"id": f"chatcmpl-{n}", "created": int(time.time()), "model": body.get("model", "stub")}
+        if server.latency:
+            time.sleep(server.latency)
+        if body.get("stream"):
+            self._stream(base, reply.get("content") or "", tool_calls, finish)
+        else:
+            message: Dict[str, Any] = {"role": "assistant", "content": reply.get("content")}
+            if tool_calls:
+                message["tool_calls"] = tool_calls
+            prompt_tokens = sum(len(_text(m)) for m in body.get("messages", [])) // 4
+            completion_tokens = len(reply.get("content") or "") // 4 + 10 * len(tool_calls)
+            self._send_json({**base, "object": "chat.completion", "choices": [
+                {"index": 0, "message": message, "finish_reason": finish, "logprobs": None}
+            ], "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                         "total_tokens": prompt_tokens + completion_tokens}})
+
+    def _stream(self, base: Dict[str, Any], content: str, tool_calls: List[Dict[str, Any]],
+                finish: str):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None):
+            data = {**base, "object": "chat.completion.chunk", "choices": [
+                {"index": 0, "delta": delta, "finish_reason": finish_reason, "logprobs": None}]}
+            self.wfile.write(f"data: {json.dumps(data)}\n\n".encode())
+            self.wfile.flush()
+
+        chunk({"role": "assistant", "content": ""})
+        for token in re.findall(r"\S+\s*", content):
+            if self.server.token_delay:
+                time.sleep(self.server.token_delay)
+            chunk({"content": token})
+        for i, call in enumerate(tool_calls):
+            chunk({"tool_calls": [{"index": i, **call}]})
+        chunk({}, finish)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def _send_json(self, body: dict, status: int = 200):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_llm_server(port: int = 0, latency_ms: float = 0.0, token_ms: float = 0.0,
+                          script: Optional[Dict[str, Any]] = None) -> ThreadingHTTPServer:
+    """Start the stub on a daemon thread; `server.calls` counts completions served."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubLLMHandler)
+    server.daemon_threads = True
+    server.latency = latency_ms / 1000.0
+    server.token_delay = token_ms / 1000.0
+    server.script = {**DEFAULT_SCRIPT, **(script or {})}
+    server.calls = 0
+    server.ids = itertools.count(1)
+    server.lock = threading.Lock()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def load_script(path: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not path:
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Stub OpenAI chat completions server")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay before each completion")
+    parser.add_argument("--token-ms", type=float, default=0.0, help="delay between streamed tokens")
+    parser.add_argument("--script", help="JSON tool-call script (default: DEFAULT_SCRIPT)")
+    args = parser.parse_args(argv)
+    server = start_stub_llm_server(args.port, args.latency_ms, args.token_ms, load_script(args.script))
+    print(f"Stub LLM server on {server.base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
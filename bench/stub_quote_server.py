@@ -0,0 +1,148 @@
+"""Local stand-in for the Alpha Vantage query API.
+
+Prices are derived from the symbol so responses are deterministic. Point the app
+at it with ALPHAVANTAGE_BASE_URL=http://127.0.0.1:<port>/query.
+
+    python -m bench.stub_quote_server --port 8765 --latency-ms 150
+"""
+import argparse
+import json
+import math
+import threading
+import time
+import zlib
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def _price(symbol: str) -> float:
+    return 10 + zlib.crc32(symbol.encode()) % 50000 / 100
+
+
+def global_quote(symbol: str) -> dict:
+    return {"Global Quote": {
+        "01. symbol": symbol,
+        "05. price": f"{_price(symbol):.4f}",
+        "06. volume": "1000000",
+        "07. latest trading day": date.today().isoformat(),
+        "10. change percent": "0.0000%",
+    }}
+
+
+def exchange_rate(from_currency: str, to_currency: str) -> dict:
+    return {"Realtime Currency Exchange Rate": {
+        "1. From_Currency Code": from_currency,
+        "3. To_Currency Code": to_currency,
+        "5. Exchange Rate": f"{_price(from_currency + to_currency) * 100:.8f}",
+        "6. Last Refreshed": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }}
+
+
+def _bar(symbol: str, t: float) -> dict:
+    # Smooth deterministic walk so the same timestamp always returns the same bar.
+    base = _price(symbol)
+    phase = zlib.crc32(symbol.encode()) % 97
+    close = base * (1 + 0.08 * math.sin(t / 9 + phase) + 0.02 * math.sin(t * 1.7 + phase))
+    return {
+        "1. open": f"{close * 0.995:.4f}",
+        "2. high": f"{close * 1.01:.4f}",
+        "3. low": f"{close * 0.99:.4f}",
+        "4. close": f"{close:.4f}",
+        "5. volume": str(1000000 + int(phase * 1000)),
+    }
+
+
+def daily_series(symbol: str, as_of: date, n: int) -> dict:
+    days, day = [], as_of
+    while len(days) < n:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    return {"Time Series (Daily)": {d.isoformat(): _bar(symbol, d.toordinal()) for d in days}}
+
+
+def intraday_series(symbol: str, as_of: date, n: int) -> dict:
+    bars, day = {}, as_of
+    while len(bars) < n:
+        if day.weekday() < 5:
+            for hour in range(16, 9, -1):
+                ts = datetime(day.year, day.month, day.day, hour)
+                bars[ts.strftime("%Y-%m-%d %H:%M:%S")] = _bar(symbol, ts.timestamp() / 3600)
+        day -= timedelta(days=1)
+    return {"Time Series (60min)": dict(sorted(bars.items(), reverse=True)[:n])}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        server = self.server
+        with server.lock:
+            server.calls[params.get("function", "")] = server.calls.get(params.get("function", ""), 0) + 1
+        delay = server.latency + server.delays.get(params.get("symbol") or params.get("from_currency"), 0.0)
+        if delay:
+            time.sleep(delay)
+
+        function = params.get("function")
+        if function == "GLOBAL_QUOTE":
+            body = global_quote(params.get("symbol", "").upper())
+        elif function == "CURRENCY_EXCHANGE_RATE":
+            body = exchange_rate(params.get("from_currency", "").upper(),
+                                 params.get("to_currency", "USD").upper())
+        elif function in ("TIME_SERIES_DAILY", "TIME_SERIES_INTRADAY"):
+            n = 100 if params.get("outputsize", "compact") == "compact" else 1000
+            build = daily_series if function == "TIME_SERIES_DAILY" else intraday_series
+            body = build(params.get("symbol", "").upper(), server.as_of, n)
+        else:
+            body = {"Error Message": f"Unsupported function {function}"}
+        self._send(body)
+
+    def _send(self, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_quote_server(port: int = 0, latency_ms: float = 0.0) -> ThreadingHTTPServer:
+    """Start the stub on a daemon thread.
+
+    `server.calls` counts requests per function; move `server.as_of` forward to
+    make new daily/intraday bars appear; `server.delays[symbol] = seconds` makes
+    one symbol slow.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency_ms / 1000.0
+    server.calls = {}
+    server.delays = {}
+    server.as_of = date.today()
+    server.lock = threading.Lock()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/query"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Stub Alpha Vantage server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args(argv)
+    server = start_stub_quote_server(args.port, args.latency_ms)
+    print(f"Stub quote server on {server.base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
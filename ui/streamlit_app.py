@@ -1,5 +1,7 @@
 import sys
 import os
+import re
+import uuid
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -8,7 +10,25 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import streamlit as st
-from app.agent import chat
+
+
+# -----------------------------------------------------------
+# Shared advisor (one per server process, not per rerun/session)
+# -----------------------------------------------------------
+@st.cache_resource(show_spinner="Loading the advisor...")
+def load_advisor():
+    import app.agent as advisor
+
+    try:
+        advisor.warmup()
+    except Exception:
+        # e.g. missing credentials: the agent is retried on the first chat, which reports the error
+        pass
+    return advisor
+
+
+advisor = load_advisor()
+
 # -----------------------------------------------------------
 # Streamlit page setup
 # -----------------------------------------------------------
@@ -22,7 +42,24 @@ st.set_page_config(
 # -----------------------------------------------------------
 # Sidebar – optional settings or info
 # -----------------------------------------------------------
+# Each browser session gets its own random identity. It can't be edited, only
+# resumed with a previously issued ID, so nobody can open another user's stored
+# profile or conversation by typing a guessable name.
+_SESSION_ID = re.compile(r"web-[0-9a-f]{32}")
+if "user_id" not in st.session_state:
+    st.session_state.user_id = f"web-{uuid.uuid4().hex}"
+
 with st.sidebar:
+    id_box = st.empty()
+    resume = st.text_input("Resume a previous session", placeholder="web-…", type="password",
+                           help="Paste an ID this app gave you earlier.").strip()
+    if resume and resume != st.session_state.user_id:
+        if _SESSION_ID.fullmatch(resume):
+            st.session_state.user_id = resume
+        else:
+            st.error("That is not a session ID issued by this app.")
+    id_box.text_input("Your session ID", value=st.session_state.user_id, disabled=True,
+                      help="Keep this to come back to your saved profile and conversation.")
     st.header(" Info")
     st.markdown("This AI advisor helps with:")
     st.markdown("1) Financial Planning Assistance\n2) Investment Guidance\n3) General Financial Education")
@@ -58,16 +95,15 @@ st.info("💡 Tip: Type naturally — the assistant will guide you and ask for a
 # -----------------------------------------------------------
 # Chat Interface
 # -----------------------------------------------------------
-if "messages" not in st.session_state:
-    st.session_state.messages = []
-
-user_id = "user_1"
+user_id = st.session_state.user_id
+# Transcript per user ID shown in this browser session; the agent keeps its own history per user.
+messages = st.session_state.setdefault("transcripts", {}).setdefault(user_id, [])
 
 st.divider()
 st.subheader("💬 Chat with Your AI Advisor")
 
 # Display previous messages
-for msg in st.session_state.messages:
+for msg in messages:
     if msg["role"] == "user":
         with st.chat_message("user"):
             st.markdown(msg["content"])
@@ -77,13 +113,12 @@ for msg in st.session_state.messages:
 
 # Chat input
 if prompt := st.chat_input("Ask about savings, insurance, or retirement..."):
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    messages.append({"role": "user", "content": prompt})
     with st.chat_message("user"):
         st.markdown(prompt)
 
     with st.chat_message("assistant"):
-        with st.spinner("Thinking..."):
-            reply = chat(user_id, prompt)
-            st.markdown(reply)
+        # Tokens render as they arrive; write_stream returns the full reply.
+        reply = st.write_stream(advisor.chat_stream(user_id, prompt))
 
-    st.session_state.messages.append({"role": "assistant", "content": reply})
+    messages.append({"role": "assistant", "content": reply})